@@ -1,12 +1,20 @@
 import json
 import tkinter as tk
+from tkinter import messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap import Style
 
 from libs.supabase_client import Supabase
+from libs.backends import SQLiteBackend, create_backend
+from libs.worker import BackgroundRunner
+from libs.jobs import ContractQueue
+from libs.stats import StatsStore
+from libs.fonts import prewarm_contract_fonts
+from libs.timing import timed, timings
 from pages.home import HomePage
 from pages.concerts import ConcertsPage
 from pages.stats import StatsPage
+from pages.diagnostics import DiagnosticsWindow
 
 class App(tk.Tk):
     def __init__(self):
@@ -15,9 +23,18 @@ class App(tk.Tk):
         with open('config.json') as config_file:
             config = json.load(config_file)
 
-        SUPABASE_URL = config["supabase_url"]
-        SUPABASE_KEY = config["supabase_key"]
-        self.supabase = Supabase(SUPABASE_URL, SUPABASE_KEY)
+        SUPABASE_URL = config.get("supabase_url")
+        SUPABASE_KEY = config.get("supabase_key")
+        backend = create_backend(config)
+        # A local database needs neither a local cache of it nor live updates
+        is_local = isinstance(backend, SQLiteBackend)
+        self.supabase = Supabase(SUPABASE_URL, SUPABASE_KEY, None if is_local else config.get("cache_path", "cache.db"), backend=backend)
+
+        self.runner = BackgroundRunner(self)
+        self.contracts = ContractQueue(self.runner)
+        self.contracts.subscribe(self.on_contract_rendered)
+        self.stats_store = StatsStore(self.supabase, self.runner, config.get("stats_ttl", 300))
+        prewarm_contract_fonts()
 
         self.style = Style(theme="darkly")
         self.iconbitmap("assets/images/icon.ico")
@@ -34,20 +51,40 @@ class App(tk.Tk):
 
         self.geometry(f"{width}x{height}+{x}+{y}")
         
+        # Status bar for background work such as contract rendering
+        self.status_bar = ttk.Label(self, text="", font=("Arial", 9), anchor="w")
+        self.status_bar.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+        self.journal_status = None  # the last journal message shown in it
+
         # Create container frame for switching pages
         self.container = ttk.Frame(self)
         self.container.pack(fill="both", expand=True)
         
         # Create page instances
         self.pages = {
-            "home": HomePage(self.container, self.supabase, self.show_page),
-            "concerts": ConcertsPage(self.container, self.supabase, self.show_page),
-            "stats": StatsPage(self.container, self.supabase, self.show_page),
+            "home": HomePage(self.container, self.supabase, self.runner, self.contracts, self.stats_store, self.show_page),
+            "concerts": ConcertsPage(self.container, self.supabase, self.runner, self.contracts, self.show_page),
+            "stats": StatsPage(self.container, self.stats_store, self.runner, self.show_page),
         }
 
+        # Upload changes saved while offline once the connection is back
+        self.supabase.start_replay(
+            on_conflict=lambda entry: self.runner.post(self.on_journal_conflict, entry),
+            on_pending=lambda counts: self.runner.post(self.on_journal_pending, counts)
+        )
+
+        # Apply other clients' changes as they happen, the pages are listening by now
+        if config.get("realtime", True) and not is_local:
+            self.supabase.subscribe_changes(on_status=lambda connected: self.runner.post(self.on_live_status, connected))
+
+        # Hidden diagnostics window with the timings of data calls, page loads and PDFs
+        self.diagnostics = None
+        self.bind_all("<Control-Shift-D>", lambda _: self.show_diagnostics())
+
         # Display the home page initially
         self.show_page("home")
 
+    @timed()
     def show_page(self, page_name, data=None):
         """Function to switch pages by hiding the current frame and showing the next one."""
         for page in self.pages.values():
@@ -65,9 +102,68 @@ class App(tk.Tk):
 
         page.pack(fill="both", expand=True)
 
+
+    def show_diagnostics(self):
+        if self.diagnostics is None or not self.diagnostics.winfo_exists():
+            self.diagnostics = DiagnosticsWindow(self, timings)
+        else:
+            self.diagnostics.refresh()
+            self.diagnostics.lift()
+
+
+    def on_live_status(self, connected):
+        self.status_bar.config(text="Live updates on" if connected else "Live updates paused, reconnecting...")
+
+
+    def on_journal_pending(self, counts):
+        if counts["pending"]:
+            text = f"{counts['pending']} change(s) waiting to upload"
+        elif counts["conflict"]:
+            text = f"{counts['conflict']} change(s) need attention"
+        elif self.status_bar.cget("text") == self.journal_status:
+            # The journal drained, this is reported on every replay round so only replace its own message
+            text = "All changes uploaded"
+        else:
+            return
+        self.journal_status = text
+        self.status_bar.config(text=text)
+
+
+    def on_journal_conflict(self, entry):
+        concert = entry["data"] or entry["server"] or {}
+        name = f"the concert by {concert.get('organizer', 'an organizer')} on {concert.get('date', 'an unknown date')}"
+
+        if entry.get("error"):
+            messagebox.showerror("Change Rejected", f"Your change to {name} was rejected by the database:\n{entry['error']}")
+            keep_mine = False
+        else:
+            action = "deleted" if entry["server"] is None else "changed"
+            keep_mine = messagebox.askyesno(
+                "Conflicting Change",
+                f"While you were offline, {name} was {action} on another computer.\n\n"
+                f"Keep your version? Choose No to use the other computer's version."
+            )
+        
+        self.runner.submit(self.supabase.resolve_conflict, entry["concert_id"], keep_mine)
+
+
+    def on_contract_rendered(self, concert, file_path, error):
+        if error is None:
+            self.status_bar.config(text=f"Contract saved in {file_path}")
+            return
+        
+        self.status_bar.config(text=f"Contract for {concert.organizer} on {concert.date} failed")
+        if messagebox.askretrycancel(
+            "Contract Failed",
+            f"The contract PDF for {concert.organizer} on {concert.date} could not be generated:\n{error}"
+        ):
+            self.contracts.enqueue(concert)
+
 def main():
     app = App()
     app.mainloop()
+    app.supabase.unsubscribe_changes()
+    app.runner.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
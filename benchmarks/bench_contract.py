@@ -0,0 +1,75 @@
+"""
+Time contract PDF generation.
+
+    python -m benchmarks.bench_contract [-n 50] [--json results.json]
+
+The first contract includes font registration (cold), the rest are pure
+drawing and disk I/O (warm).
+"""
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+from libs.utils import generate_contract_pdf
+from libs.models import Concert
+
+
+SAMPLE_CONCERT = Concert.from_row({
+    "id": "00000000-0000-0000-0000-000000000000",
+    "organizer": "Uttarpara Sporting Club",
+    "venue": "J.K. Street Ground, Uttarpara",
+    "city": "Uttarpara",
+    "district": "Hooghly",
+    "date": "2025-03-12",
+    "time": "19:30:00",
+    "is_sound_included": True,
+    "total": 150000,
+    "advance": 50000,
+    "contact": "9876543210",
+    "note": None,
+    "is_cancelled": False,
+})
+
+
+def run(iterations: int) -> dict:
+    with tempfile.TemporaryDirectory() as folder:
+        timings = []
+        for i in range(iterations):
+            file_path = str(Path(folder) / f"contract-{i}.pdf")
+            started = time.perf_counter()
+            generate_contract_pdf(SAMPLE_CONCERT, file_path=file_path)
+            timings.append((time.perf_counter() - started) * 1000)
+        size = Path(folder, "contract-0.pdf").stat().st_size
+
+    warm = timings[1:] or timings
+    return {
+        "benchmark": "generate_contract_pdf",
+        "iterations": iterations,
+        "cold_ms": round(timings[0], 3),
+        "warm_mean_ms": round(statistics.mean(warm), 3),
+        "warm_median_ms": round(statistics.median(warm), 3),
+        "warm_min_ms": round(min(warm), 3),
+        "file_bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    for key, value in results.items():
+        print(f"{key:>16}: {value}")
+
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Time the amount formatting against the functions it replaced.
+
+    python -m benchmarks.bench_formatting [-n 100000] [--json results.json]
+
+Times formatting a column of amounts as the concerts list does, and
+spelling out contract amounts, against the previous implementations kept
+as the reference in tests/reference_formatting.py, where
+tests/test_formatting.py checks that both agree.
+"""
+import json
+import time
+import argparse
+
+from libs.formatting import format_indian_number, format_indian_numbers, number_to_words, group_digits, integer_to_words
+from tests.reference_formatting import amounts, reference_format_indian_number, reference_number_to_words
+
+
+def clear_caches():
+    group_digits.cache_clear()
+    integer_to_words.cache_clear()
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def run(count: int) -> dict:
+    values = amounts(count)
+
+    # Cold: the caches start empty, as on the first page load
+    clear_caches()
+    return {
+        "benchmark": "formatting",
+        "amounts": count,
+        "reference_format_ms": round(timed(lambda: [reference_format_indian_number(value) for value in values]), 3),
+        "format_ms": round(timed(lambda: [format_indian_number(value) for value in values]), 3),
+        "format_batch_ms": round(timed(lambda: format_indian_numbers(values)), 3),
+        "reference_words_ms": round(timed(lambda: [reference_number_to_words(value) for value in values]), 3),
+        "words_ms": round(timed(lambda: [number_to_words(value) for value in values]), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--amounts", type=int, default=100000)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.amounts)
+    for key, value in results.items():
+        print(f"{key:>19}: {value}")
+
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
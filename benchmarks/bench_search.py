@@ -0,0 +1,112 @@
+"""
+Time the concert search index on synthetic concerts.
+
+    python -m benchmarks.bench_search [-c 30000] [--json results.json]
+
+Reports the time to build the index, to re-index changed rows and the
+slowest lookup of a set of queries, each checked against a plain scan.
+"""
+import json
+import time
+import random
+import string
+import argparse
+
+from libs.models import Concert
+from libs.search import SearchIndex, SEARCH_FIELDS, tokenize
+
+
+QUERIES = ("a", "ho", "hoo", "9", "987", "spo", "utt spo", "club 98", "zzzz")
+
+
+def make_concerts(count: int, seed: int = 0) -> dict[str, Concert]:
+    rng = random.Random(seed)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(3000)]
+    words += ["Uttarpara", "Sporting", "Club", "Hooghly", "Mela", "Durga", "Puja"]
+    districts = ("Hooghly", "Howrah", "Nadia", "Purba Bardhaman", "North 24 Parganas")
+    return {
+        str(i): Concert(
+            i,
+            organizer=" ".join(rng.sample(words, 3)),
+            venue=" ".join(rng.sample(words, 2)),
+            city=rng.choice(words),
+            district=rng.choice(districts),
+            contact=str(rng.randint(6000000000, 9999999999)),
+            note=rng.choice(words) if rng.random() < 0.2 else None,
+        )
+        for i in range(count)
+    }
+
+
+def scan(concerts: dict[str, Concert], query: str) -> set[str]:
+    words = tokenize(query)
+    return {
+        concert_id for concert_id, concert in concerts.items()
+        if all(
+            any(
+                token.startswith(word)
+                for field in SEARCH_FIELDS if getattr(concert, field)
+                for token in tokenize(str(getattr(concert, field)))
+            )
+            for word in words
+        )
+    }
+
+
+def best_of(func, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(count: int) -> dict:
+    concerts = make_concerts(count)
+
+    started = time.perf_counter()
+    index = SearchIndex()
+    index.add_many(concerts)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # Re-index a hundred edited rows, as the change notifications do
+    edited = {concert_id: concert.replace(organizer=f"Edited {concert_id}") for concert_id, concert in list(concerts.items())[:100]}
+    started = time.perf_counter()
+    for concert_id, concert in edited.items():
+        index.add(concert_id, concert)
+    update_ms = (time.perf_counter() - started) * 1000 / len(edited)
+    concerts.update(edited)
+
+    lookups = {}
+    for query in QUERIES:
+        assert index.search(query) == scan(concerts, query), f"Wrong results for {query!r}"
+        lookups[query] = round(best_of(lambda: index.search(query)), 4)
+
+    return {
+        "benchmark": "search_index",
+        "concerts": count,
+        "build_ms": round(build_ms, 3),
+        "update_ms_per_row": round(update_ms, 4),
+        "slowest_lookup_ms": max(lookups.values()),
+        "lookup_ms": lookups,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-c", "--concerts", type=int, default=30000)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.concerts)
+    for key, value in results.items():
+        print(f"{key:>18}: {value}")
+
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
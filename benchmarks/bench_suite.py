@@ -0,0 +1,159 @@
+"""
+Time the main data paths of the app on synthetic concert tables.
+
+    python -m benchmarks.bench_suite [-s 1000 10000 100000] [--backend sqlite] [--latency 0.05] [--json results.json]
+
+For each size (benchmarks/dataset.py) the rows are served by a local
+stand-in for the Supabase client (benchmarks/standin.py), or with
+--backend sqlite by the SQLite backend (libs/backends.py), and the suite times:
+
+    list loading   the first page and the whole table, from the server and
+                   from the local cache, including the initial sync
+    stats          a full recount and a read of the kept-current counts
+    treeview       filling the concerts page with every row, this needs a
+                   display, run under xvfb-run on a headless machine
+    contract       one contract PDF (once, it doesn't depend on the size)
+
+The JSON output records the commit, so runs can be compared across commits.
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from benchmarks import bench_contract
+from benchmarks.dataset import SIZES, make_rows
+from benchmarks.standin import StandInClient
+from libs.backends import SQLiteBackend, PostgrestBackend
+from libs.supabase_client import Supabase, LIST_COLUMNS
+
+
+def make_backend(kind: str, rows: list[dict], latency: float, folder: str):
+    if kind == "sqlite":
+        backend = SQLiteBackend(str(Path(folder, "backend.db")), latency)
+        backend.import_rows(rows)
+        return backend
+    return PostgrestBackend(StandInClient(rows), latency)
+
+
+def timed(func) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = func()
+    return round((time.perf_counter() - started) * 1000, 3), result
+
+
+def bench_lists(backend) -> dict:
+    results = {}
+    supabase = Supabase("", "", backend=backend)
+    results["server_first_page_ms"], _ = timed(lambda: supabase.get_concerts_page(None, 100, LIST_COLUMNS))
+    results["server_all_ms"], _ = timed(lambda: supabase.get_concerts(LIST_COLUMNS))
+    results["server_all_full_rows_ms"], _ = timed(lambda: supabase.get_concerts())
+
+    with tempfile.TemporaryDirectory() as folder:
+        supabase = Supabase("", "", str(Path(folder, "cache.db")), backend=backend)
+        results["cache_initial_sync_ms"], _ = timed(supabase.sync_concerts)
+        results["cache_delta_sync_ms"], _ = timed(supabase.sync_concerts)
+        results["cache_first_page_ms"], _ = timed(lambda: supabase.get_concerts_page(None, 100))
+        results["cache_all_ms"], _ = timed(supabase.get_cached_concerts)
+        supabase.cache.conn.close()
+        supabase.journal.conn.close()
+    return results
+
+
+def bench_stats(backend) -> dict:
+    supabase = Supabase("", "", backend=backend)
+    recount_ms, _ = timed(lambda: supabase.get_stats(refresh=True))
+    kept_ms, _ = timed(supabase.get_stats)
+    return {"stats_recount_ms": recount_ms, "stats_kept_ms": kept_ms}
+
+
+def bench_treeview(backend) -> dict:
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        return {"treeview": f"skipped ({error})"}
+
+    from libs.worker import BackgroundRunner
+    from libs.jobs import ContractQueue
+    from pages.concerts import ConcertsPage
+
+    try:
+        root.withdraw()
+        runner = BackgroundRunner(root)
+        supabase = Supabase("", "", backend=backend)
+        page = ConcertsPage(root, supabase, runner, ContractQueue(runner), lambda *_: None)
+        page.pack()
+        concerts = supabase.get_concerts(LIST_COLUMNS)
+
+        def fill():
+            page.insert_concerts(concerts)
+            root.update_idletasks()
+
+        results = {}
+        results["treeview_fill_ms"], _ = timed(fill)
+        results["treeview_search_ms"], _ = timed(lambda: (page.search_var.set("sporting"), root.update_idletasks()))
+        results["treeview_sort_ms"], _ = timed(lambda: (page.sort_by("total"), root.update_idletasks()))
+        runner.shutdown()
+        return results
+    finally:
+        root.destroy()
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: list[int], kind: str, latency: float, contracts: int) -> dict:
+    results = {
+        "benchmark": "suite",
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": kind,
+        "latency_s": latency,
+        "sizes": {},
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            backend = make_backend(kind, make_rows(size), latency, folder)
+            results["sizes"][str(size)] = {
+                **bench_lists(backend),
+                **bench_stats(backend),
+                **bench_treeview(backend),
+            }
+            if kind == "sqlite":
+                backend.conn.close()
+        print(f"{size} rows: {json.dumps(results['sizes'][str(size)])}", file=sys.stderr)
+
+    results["contract"] = bench_contract.run(contracts)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--backend", choices=("standin", "sqlite"), default="standin")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every call to the backend")
+    parser.add_argument("--contracts", type=int, default=10, help="Contracts to render")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.backend, args.latency, args.contracts)
+    print(json.dumps(results, indent=2))
+
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Synthetic concert tables for the benchmarks, shaped like the real one:
+a few hundred organizers and venues that book again and again, dates
+spread over the previous, current and next year, round-figure fees and
+about one concert in twenty cancelled.
+"""
+import uuid
+import random
+import string
+from datetime import date, datetime, timedelta, timezone
+
+from libs.data import Districts
+
+
+SIZES = (1000, 10000, 100000)
+
+
+def make_rows(count: int, seed: int = 0) -> list[dict]:
+    """Return count concert rows as PostgREST would, newest first."""
+    rng = random.Random(seed)
+
+    def word() -> str:
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))).capitalize()
+
+    organizers = [f"{word()} {rng.choice(('Sporting Club', 'Puja Committee', 'Sangha', 'Mela Samity'))}" for _ in range(400)]
+    venues = [f"{word()} {rng.choice(('Ground', 'Maidan', 'Park', 'School'))}" for _ in range(300)]
+    cities = [word() for _ in range(200)]
+
+    first_day = date(date.today().year - 1, 1, 1)
+    stamp = datetime(first_day.year, 1, 1, tzinfo=timezone.utc)
+
+    rows = []
+    for i in range(count):
+        concert_date = first_day + timedelta(days=rng.randrange(3 * 365))
+        total = rng.randint(20, 300) * 1000
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "organizer": rng.choice(organizers),
+            "venue": rng.choice(venues),
+            "city": rng.choice(cities),
+            "district": rng.choice(Districts) if rng.random() < 0.97 else None,
+            "date": concert_date.isoformat(),
+            "time": f"{rng.randint(16, 22):02d}:{rng.choice((0, 30)):02d}:00",
+            "is_sound_included": rng.random() < 0.4,
+            "total": total,
+            "advance": rng.choice((0, total // 4, total // 2, total)),
+            "contact": str(rng.randint(6000000000, 9999999999)),
+            "note": " ".join(word() for _ in range(rng.randint(5, 40))) if rng.random() < 0.3 else None,
+            "is_cancelled": rng.random() < 0.05,
+            "updated_at": (stamp + timedelta(seconds=i)).isoformat(),
+        })
+
+    rows.sort(key=lambda row: (row["date"], row["id"]), reverse=True)
+    return rows
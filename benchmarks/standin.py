@@ -0,0 +1,180 @@
+"""
+A local stand-in for the Supabase client, serving concert rows from memory.
+
+It covers the subset of the PostgREST query builder libs/supabase_client.py
+uses, and the concert_stats function (sql/002_concert_stats.sql). Every
+response goes through JSON like a real one, so the benchmarks still pay the
+decode cost, and selects are cut off at max_rows like Supabase's. Network
+latency is added by the backend (libs/backends.py).
+"""
+import re
+import json
+import threading
+from datetime import datetime, timezone
+
+
+# column.op.value,and(column.eq.value,id.op.value), the keyset conditions of libs/backends.py
+KEYSET = re.compile(r'(\w+)\.(lt|gt)\.("[^"]*"|[^,]+),and\(\1\.eq\.("[^"]*"|[^,]+),id\.(lt|gt)\.([^)]+)\)')
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class StandInClient:
+    def __init__(self, rows: list[dict], max_rows: int = 1000):
+        self.tables = {
+            "concert": {str(row["id"]): dict(row) for row in rows},
+            "concert_tombstone": {},
+        }
+        self.max_rows = max_rows
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+    def table(self, name: str) -> "Query":
+        return Query(self, name)
+
+
+    def rpc(self, name: str, params: dict) -> "Query":
+        if name != "concert_stats":
+            raise NotImplementedError(name)
+        return Query(self, None, rpc=lambda: self.concert_stats(params["target_year"]))
+
+
+    def concert_stats(self, target_year: int) -> dict:
+        stats = {"previous": 0, "current": 0, "districts": {}, "months": {}}
+        for row in self.tables["concert"].values():
+            if row["is_cancelled"]:
+                continue
+            year, month = int(row["date"][:4]), int(row["date"][5:7])
+            if year == target_year - 1:
+                stats["previous"] += 1
+            elif year == target_year:
+                stats["current"] += 1
+                district = row["district"] or "Other"
+                stats["districts"][district] = stats["districts"].get(district, 0) + 1
+                stats["months"][str(month)] = stats["months"].get(str(month), 0) + 1
+        return stats
+
+
+    def respond(self, data):
+        with self.lock:
+            self.requests += 1
+        return Response(json.loads(json.dumps(data)))
+
+
+class Query:
+    def __init__(self, client: StandInClient, table: str | None, rpc=None):
+        self.client = client
+        self.table = table
+        self.rpc = rpc
+        self.action = "select"
+        self.columns = None
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.count = None
+
+
+    def select(self, columns: str = "*") -> "Query":
+        self.columns = None if columns == "*" else [column.strip() for column in columns.split(",")]
+        return self
+
+
+    def upsert(self, rows: dict | list[dict], on_conflict: str = "id") -> "Query":
+        self.action = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+
+    def update(self, values: dict) -> "Query":
+        self.action = "update"
+        self.payload = values
+        return self
+
+
+    def delete(self) -> "Query":
+        self.action = "delete"
+        return self
+
+
+    def eq(self, column: str, value) -> "Query":
+        self.filters.append(lambda row: str(row[column]) == str(value))
+        return self
+
+
+    def gte(self, column: str, value) -> "Query":
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+
+    def in_(self, column: str, values) -> "Query":
+        values = {str(value) for value in values}
+        self.filters.append(lambda row: str(row[column]) in values)
+        return self
+
+
+    def or_(self, condition: str) -> "Query":
+        # Only the keyset conditions
+        match = KEYSET.fullmatch(condition)
+        if match is None:
+            raise NotImplementedError(condition)
+        column, op, key, _, id_op, id_key = match.groups()
+        key = key.strip('"')
+        if op == "lt":
+            self.filters.append(lambda row: row[column] < key or (row[column] == key and str(row["id"]) < id_key))
+        else:
+            self.filters.append(lambda row: row[column] > key or (row[column] == key and str(row["id"]) > id_key))
+        return self
+
+
+    def order(self, column: str, desc: bool = False) -> "Query":
+        self.orders.append((column, desc))
+        return self
+
+
+    def limit(self, count: int) -> "Query":
+        self.count = count
+        return self
+
+
+    def execute(self) -> Response:
+        if self.rpc is not None:
+            return self.client.respond(self.rpc())
+
+        with self.client.lock:
+            rows = self.client.tables[self.table]
+            matched = [row for row in rows.values() if all(check(row) for check in self.filters)]
+
+            if self.action == "upsert":
+                now = datetime.now(timezone.utc).isoformat()
+                matched = []
+                for row in self.payload:
+                    row = {**rows.get(str(row["id"]), {}), **row, "updated_at": now}
+                    rows[str(row["id"])] = row
+                    # As the concert_clear_tombstone trigger does for a recreated concert
+                    self.client.tables["concert_tombstone"].pop(str(row["id"]), None)
+                    matched.append(row)
+            elif self.action == "update":
+                now = datetime.now(timezone.utc).isoformat()
+                for row in matched:
+                    row.update(self.payload, updated_at=now)
+            elif self.action == "delete":
+                now = datetime.now(timezone.utc).isoformat()
+                for row in matched:
+                    del rows[str(row["id"])]
+                    self.client.tables["concert_tombstone"][str(row["id"])] = {"id": row["id"], "deleted_at": now}
+
+            # Stable sorts, last key first
+            for column, desc in reversed(self.orders):
+                matched.sort(key=lambda row: row[column], reverse=desc)
+            if self.action == "select":
+                matched = matched[:min(self.count or self.client.max_rows, self.client.max_rows)]
+            if self.columns is not None:
+                matched = [{column: row[column] for column in self.columns} for row in matched]
+            else:
+                matched = [dict(row) for row in matched]
+
+        return self.client.respond(matched)
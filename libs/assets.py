@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+from reportlab.lib.utils import ImageReader
+
+
+class AssetCache:
+    """Decoded images shared across the app, keyed by path and size, so every
+    file is decoded (and resized) once per process. The least recently used
+    images are dropped once the decoded pixels exceed max_bytes."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.images = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+
+
+    def image_reader(self, path: str, size: tuple[int, int] | None = None) -> ImageReader:
+        """Return a ReportLab ImageReader for the image, optionally resized to size pixels."""
+        return self.get(("reader", path, size), lambda: self.decode_reader(path, size))
+
+
+    def photo_image(self, path: str, size: tuple[int, int] | None = None) -> ImageTk.PhotoImage:
+        """Return a Tk PhotoImage for the image, optionally resized. Call from the Tk thread only."""
+        return self.get(("photo", path, size), lambda: self.decode_photo(path, size))
+
+
+    def get(self, key: tuple, load):
+        with self.lock:
+            if key in self.images:
+                self.images.move_to_end(key)
+                return self.images[key]
+
+        image, size = load()
+        with self.lock:
+            if key not in self.images:
+                self.images[key] = image
+                self.sizes[key] = size
+                self.total_bytes += size
+                self.evict()
+            return self.images[key]
+
+
+    def evict(self):
+        # Keep at least the newest image even if it alone is over the budget
+        while self.total_bytes > self.max_bytes and len(self.images) > 1:
+            key, _ = self.images.popitem(last=False)
+            self.total_bytes -= self.sizes.pop(key)
+
+
+    def decode_reader(self, path: str, size: tuple[int, int] | None) -> tuple[ImageReader, int]:
+        if size is None:
+            # Let ReportLab keep JPEGs as they are, it embeds them without re-encoding
+            reader = ImageReader(path)
+            width, height = reader.getSize()
+            return reader, width * height * 4
+
+        image = Image.open(path)
+        image.load()
+        image = image.resize(size)
+        return ImageReader(image), size[0] * size[1] * len(image.getbands())
+
+
+    def decode_photo(self, path: str, size: tuple[int, int] | None) -> tuple[ImageTk.PhotoImage, int]:
+        image = Image.open(path)
+        if size is not None:
+            image = image.resize(size)
+        width, height = image.size
+        return ImageTk.PhotoImage(image), width * height * 4
+
+
+assets = AssetCache()
@@ -0,0 +1,351 @@
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+
+from supabase import create_client
+
+
+# Rows per request when reading a whole table. Supabase cuts every response
+# off at the project's max-rows setting (1000 by default), so this must not
+# exceed it: a page shorter than this is taken to be the last one
+PAGE_ROWS = 1000
+
+# Columns of the concert table, in the order of sql/ and libs/models.py
+COLUMNS = (
+    "id", "organizer", "venue", "city", "district", "date", "time", "is_sound_included",
+    "total", "advance", "contact", "note", "is_cancelled", "updated_at",
+)
+
+
+class ConcertBackend(ABC):
+    """Where the concert table lives. Supabase (libs/supabase_client.py) keeps
+    the cache, journal, stats and change listeners, and goes through a backend
+    for every read and write of the table itself. Rows are dicts shaped like
+    PostgREST's: ISO date, time and updated_at strings.
+
+    latency (seconds) is slept before every call, to measure the app against
+    a realistic network on a fast local backend."""
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+
+
+    def delay(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+
+    @abstractmethod
+    def select_concerts(self, columns: tuple[str, ...] | None = None) -> list[dict]:
+        """Every concert, newest first, with only the given columns if any."""
+
+
+    @abstractmethod
+    def select_page(self, after: tuple[str, str] | None, limit: int, columns: tuple[str, ...] | None = None) -> list[dict]:
+        """Up to limit concerts following the (date, id) key, newest first."""
+
+
+    @abstractmethod
+    def select_changes(self, since: str | None) -> tuple[list[dict], list[dict]]:
+        """Rows changed and {"id", "deleted_at"} tombstones left since the watermark (inclusive), or all of them."""
+
+
+    @abstractmethod
+    def select_rows(self, concert_ids: list[str]) -> list[dict]:
+        """The current rows of the given concerts, those that no longer exist are left out."""
+
+
+    @abstractmethod
+    def concert_stats(self, target_year: int) -> dict:
+        """Counts of the concerts that aren't cancelled, shaped like the result of sql/002_concert_stats.sql."""
+
+
+    @abstractmethod
+    def upsert(self, rows: list[dict]) -> list[dict]:
+        """Insert or update rows, returning them as stored."""
+
+
+    @abstractmethod
+    def update_cancelled(self, concert_ids: list[str], is_cancelled: bool) -> list[dict]:
+        """Set is_cancelled on the given concerts, returning the updated rows."""
+
+
+    @abstractmethod
+    def delete(self, concert_ids: list[str]) -> None:
+        """Delete the given concerts, leaving a tombstone for each."""
+
+
+class PostgrestBackend(ConcertBackend):
+    """The concert table on Supabase, through its PostgREST client."""
+
+    def __init__(self, client, latency: float = 0):
+        super().__init__(latency)
+        self.client = client
+
+
+    def select_concerts(self, columns=None):
+        if columns:
+            # The keyset of the next page
+            columns = tuple(columns) + tuple(column for column in ("date", "id") if column not in columns)
+        rows = []
+        while True:
+            page = self.select_page((rows[-1]["date"], rows[-1]["id"]) if rows else None, PAGE_ROWS, columns)
+            rows += page
+            if len(page) < PAGE_ROWS:
+                return rows
+
+
+    def select_page(self, after, limit, columns=None):
+        self.delay()
+        query = (self.client.table("concert")
+                            .select(",".join(columns) if columns else "*")
+                            .order("date", desc=True)
+                            .order("id", desc=True)
+                            .limit(limit))
+        if after:
+            date_key, id_key = after
+            query = query.or_(f"date.lt.{date_key},and(date.eq.{date_key},id.lt.{id_key})")
+        return query.execute().data or []
+
+
+    def select_changes(self, since):
+        return (
+            self.select_since("concert", "*", "updated_at", since),
+            self.select_since("concert_tombstone", "id, deleted_at", "deleted_at", since),
+        )
+
+
+    def select_since(self, table: str, columns: str, stamp: str, since: str | None) -> list[dict]:
+        # Paged on (stamp, id) from the last row seen rather than by offset, a
+        # row changed in the meantime only moves further on and can't be skipped
+        rows = []
+        while True:
+            self.delay()
+            query = self.client.table(table).select(columns).order(stamp).order("id").limit(PAGE_ROWS)
+            if rows:
+                last_stamp, last_id = rows[-1][stamp], rows[-1]["id"]
+                query = query.or_(f'{stamp}.gt."{last_stamp}",and({stamp}.eq."{last_stamp}",id.gt.{last_id})')
+            elif since:
+                query = query.gte(stamp, since)
+            page = query.execute().data or []
+            rows += page
+            if len(page) < PAGE_ROWS:
+                return rows
+
+
+    def select_rows(self, concert_ids):
+        self.delay()
+        return self.client.table("concert").select("*").in_("id", concert_ids).execute().data or []
+
+
+    def concert_stats(self, target_year):
+        self.delay()
+        return self.client.rpc("concert_stats", {"target_year": target_year}).execute().data or {}
+
+
+    def upsert(self, rows):
+        self.delay()
+        return self.client.table("concert").upsert(rows, on_conflict="id").execute().data or []
+
+
+    def update_cancelled(self, concert_ids, is_cancelled):
+        self.delay()
+        return self.client.table("concert").update({"is_cancelled": is_cancelled}).in_("id", concert_ids).execute().data or []
+
+
+    def delete(self, concert_ids):
+        self.delay()
+        self.client.table("concert").delete().in_("id", concert_ids).execute()
+
+
+class SQLiteBackend(ConcertBackend):
+    """The concert table in a local SQLite file, for demos, testing and use
+    without a network. It keeps updated_at and the tombstones itself, so a
+    local cache syncs from it exactly as from Supabase."""
+
+    def __init__(self, path: str, latency: float = 0):
+        super().__init__(latency)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS concert (
+                id TEXT PRIMARY KEY,
+                organizer TEXT NOT NULL,
+                venue TEXT,
+                city TEXT,
+                district TEXT,
+                date TEXT NOT NULL,
+                time TEXT NOT NULL,
+                is_sound_included INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                advance INTEGER NOT NULL DEFAULT 0,
+                contact TEXT,
+                note TEXT,
+                is_cancelled INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            );
+            -- The list pages newest first, the stats count one year at a time, the sync asks for recent changes
+            CREATE INDEX IF NOT EXISTS concert_date_idx ON concert (date DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS concert_updated_at_idx ON concert (updated_at);
+            CREATE TABLE IF NOT EXISTS concert_tombstone (
+                id TEXT PRIMARY KEY,
+                deleted_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS concert_tombstone_deleted_at_idx ON concert_tombstone (deleted_at);
+        """)
+        self.conn.commit()
+
+
+    def query(self, sql: str, params: tuple = ()) -> list[dict]:
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self.to_row(row) for row in rows]
+
+
+    def to_row(self, row: sqlite3.Row) -> dict:
+        row = dict(row)
+        for column in ("is_sound_included", "is_cancelled"):
+            if column in row:
+                row[column] = bool(row[column])
+        return row
+
+
+    def select_list(self, columns) -> str:
+        return ", ".join(column for column in columns if column in COLUMNS) if columns else "*"
+
+
+    def placeholders(self, values: list) -> str:
+        return ", ".join("?" * len(values))
+
+
+    def now(self) -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+
+    def select_concerts(self, columns=None):
+        self.delay()
+        return self.query(f"SELECT {self.select_list(columns)} FROM concert ORDER BY date DESC, id DESC")
+
+
+    def select_page(self, after, limit, columns=None):
+        self.delay()
+        sql = f"SELECT {self.select_list(columns)} FROM concert"
+        params = ()
+        if after:
+            sql += " WHERE date < ? OR (date = ? AND id < ?)"
+            params = (after[0], after[0], after[1])
+        return self.query(sql + " ORDER BY date DESC, id DESC LIMIT ?", params + (limit,))
+
+
+    def select_changes(self, since):
+        self.delay()
+        if since:
+            return (
+                self.query("SELECT * FROM concert WHERE updated_at >= ?", (since,)),
+                self.query("SELECT id, deleted_at FROM concert_tombstone WHERE deleted_at >= ?", (since,)),
+            )
+        return self.query("SELECT * FROM concert"), self.query("SELECT id, deleted_at FROM concert_tombstone")
+
+
+    def select_rows(self, concert_ids):
+        self.delay()
+        concert_ids = [str(concert_id) for concert_id in concert_ids]
+        return self.query(f"SELECT * FROM concert WHERE id IN ({self.placeholders(concert_ids)})", tuple(concert_ids))
+
+
+    def concert_stats(self, target_year):
+        self.delay()
+        bounds = tuple(date(year, 1, 1).isoformat() for year in (target_year - 1, target_year, target_year + 1))
+        with self.lock:
+            previous, current = self.conn.execute("""
+                SELECT COUNT(*) FILTER (WHERE date < ?), COUNT(*) FILTER (WHERE date >= ?)
+                FROM concert WHERE NOT is_cancelled AND date >= ? AND date < ?
+            """, (bounds[1], bounds[1], bounds[0], bounds[2])).fetchone()
+            districts = self.conn.execute("""
+                SELECT COALESCE(district, 'Other'), COUNT(*) FROM concert
+                WHERE NOT is_cancelled AND date >= ? AND date < ? GROUP BY 1
+            """, bounds[1:]).fetchall()
+            months = self.conn.execute("""
+                SELECT CAST(substr(date, 6, 2) AS INTEGER), COUNT(*) FROM concert
+                WHERE NOT is_cancelled AND date >= ? AND date < ? GROUP BY 1
+            """, bounds[1:]).fetchall()
+        return {
+            "previous": previous,
+            "current": current,
+            "districts": {district: count for district, count in districts},
+            # Keys are strings, as they come back from the JSON of the Supabase function
+            "months": {str(month): count for month, count in months},
+        }
+
+
+    def import_rows(self, rows: list[dict]) -> None:
+        """Load rows as they are, keeping their updated_at, e.g. from an export of the Supabase table."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO concert ({', '.join(COLUMNS)}) VALUES ({self.placeholders(COLUMNS)})",
+                [tuple(row.get(column) for column in COLUMNS) for row in rows]
+            )
+
+
+    def upsert(self, rows):
+        self.delay()
+        if not rows:
+            return []
+        stamp = self.now()
+        with self.lock, self.conn:
+            for row in rows:
+                values = {column: row[column] for column in COLUMNS if column in row and column != "updated_at"}
+                values["id"] = str(values["id"])
+                values["updated_at"] = stamp
+                names = ", ".join(values)
+                updates = ", ".join(f"{column} = excluded.{column}" for column in values if column != "id")
+                self.conn.execute(
+                    f"INSERT INTO concert ({names}) VALUES ({self.placeholders(values)}) ON CONFLICT (id) DO UPDATE SET {updates}",
+                    tuple(values.values())
+                )
+            self.conn.execute(
+                f"DELETE FROM concert_tombstone WHERE id IN ({self.placeholders(rows)})", tuple(str(row["id"]) for row in rows)
+            )
+        return self.select_rows([row["id"] for row in rows])
+
+
+    def update_cancelled(self, concert_ids, is_cancelled):
+        self.delay()
+        concert_ids = [str(concert_id) for concert_id in concert_ids]
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"UPDATE concert SET is_cancelled = ?, updated_at = ? WHERE id IN ({self.placeholders(concert_ids)})",
+                (is_cancelled, self.now(), *concert_ids)
+            )
+        return self.select_rows(concert_ids)
+
+
+    def delete(self, concert_ids):
+        self.delay()
+        concert_ids = [str(concert_id) for concert_id in concert_ids]
+        stamp = self.now()
+        with self.lock, self.conn:
+            existing = self.conn.execute(
+                f"SELECT id FROM concert WHERE id IN ({self.placeholders(concert_ids)})", tuple(concert_ids)
+            ).fetchall()
+            self.conn.execute(f"DELETE FROM concert WHERE id IN ({self.placeholders(concert_ids)})", tuple(concert_ids))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO concert_tombstone (id, deleted_at) VALUES (?, ?)",
+                [(concert_id, stamp) for (concert_id,) in existing]
+            )
+
+
+def create_backend(config: dict) -> ConcertBackend:
+    """The backend chosen in config.json: "backend" is "supabase" (the default,
+    using supabase_url and supabase_key) or "sqlite" (using sqlite_path), and
+    "latency" adds that many seconds to every call."""
+    kind = config.get("backend", "supabase")
+    latency = config.get("latency", 0)
+    if kind == "sqlite":
+        return SQLiteBackend(config.get("sqlite_path", "concerts.db"), latency)
+    if kind == "supabase":
+        return PostgrestBackend(create_client(config["supabase_url"], config["supabase_key"]), latency)
+    raise ValueError(f"Unknown backend {kind!r} in config.json, expected \"supabase\" or \"sqlite\"")
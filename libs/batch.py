@@ -0,0 +1,116 @@
+"""
+Batch contract generation, rendering many contracts in parallel across CPU cores.
+
+    python -m libs.batch --from 2025-01-01 --to 2025-03-31 [--district Hooghly] [--id ID ...] [--workers N]
+"""
+import os
+import json
+import argparse
+from collections import Counter
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from libs.fonts import register_contract_fonts
+from libs.utils import generate_contract_pdf, get_filepath
+from libs.models import Concert
+
+
+def select_concerts(concerts: list[Concert], start: date | None = None, end: date | None = None,
+                    district: str | None = None, ids: list[str] | None = None,
+                    include_cancelled: bool = False) -> list[Concert]:
+    """Filter concerts by an inclusive date range, a district and/or a list of IDs."""
+    ids = {str(concert_id) for concert_id in ids} if ids else None
+    return [
+        concert for concert in concerts
+        if (include_cancelled or not concert.is_cancelled)
+        and (start is None or concert.date >= start)
+        and (end is None or concert.date <= end)
+        and (district is None or concert.district == district)
+        and (ids is None or concert.id in ids)
+    ]
+
+
+def contract_paths(concerts: list[Concert]) -> dict[str, str]:
+    """
+    The file of each concert's contract. The usual name only has the date and the
+    city, so concerts sharing both get the organizer added, and the ID as well if
+    that still collides, rather than having their workers overwrite one file.
+    """
+    paths = {concert.id: get_filepath(concert.date, concert.city) for concert in concerts}
+    for key in ("organizer", "id"):
+        counts = Counter(paths.values())
+        for concert in concerts:
+            path = paths[concert.id]
+            if counts[path] > 1:
+                paths[concert.id] = f"{path.removesuffix('.pdf')} {getattr(concert, key)}.pdf"
+    return paths
+
+
+def generate_contracts(concerts: list[Concert], max_workers: int | None = None, progress=None) -> tuple[dict, dict]:
+    """
+    Render the contracts of all given concerts in a process pool.
+    progress(done, total, concert, error) is called as each contract finishes.
+    Returns ({concert_id: file_path}, {concert_id: error message}).
+    """
+    files = {}
+    failures = {}
+    if not concerts:
+        return files, failures
+
+    # Each worker registers the fonts once and then reuses them for every contract it renders
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=register_contract_fonts) as pool:
+        paths = contract_paths(concerts)
+        futures = {
+            pool.submit(generate_contract_pdf, concert, file_path=paths[concert.id]): concert
+            for concert in concerts
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            concert = futures[future]
+            error = future.exception()
+            if error is None:
+                files[concert.id] = future.result()
+            else:
+                failures[concert.id] = f"{type(error).__name__}: {error}"
+
+            if progress:
+                progress(done, len(concerts), concert, error)
+
+    return files, failures
+
+
+def main():
+    from libs.supabase_client import Supabase
+    from libs.backends import SQLiteBackend, create_backend
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="First concert date, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Last concert date, YYYY-MM-DD")
+    parser.add_argument("--district")
+    parser.add_argument("--id", dest="ids", action="append", help="Concert ID, can be repeated")
+    parser.add_argument("--include-cancelled", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with open('config.json') as config_file:
+        config = json.load(config_file)
+    # The same backend as the app, a local database needs no cache of its own
+    backend = create_backend(config)
+    cache_path = None if isinstance(backend, SQLiteBackend) else config.get("cache_path", "cache.db")
+    supabase = Supabase(config.get("supabase_url"), config.get("supabase_key"), cache_path, backend=backend)
+
+    concerts = select_concerts(supabase.get_concerts(), args.start, args.end, args.district, args.ids, args.include_cancelled)
+    print(f"Generating {len(concerts)} contracts with {args.workers} workers")
+
+    def progress(done, total, concert, error):
+        status = "FAILED" if error else "ok"
+        print(f"[{done}/{total}] {concert.date} {concert.organizer}: {status}")
+
+    files, failures = generate_contracts(concerts, args.workers, progress)
+
+    print(f"{len(files)} generated, {len(failures)} failed")
+    for concert_id, error in failures.items():
+        print(f"  {concert_id}: {error}")
+
+
+if __name__ == "__main__":
+    main()
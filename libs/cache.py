@@ -0,0 +1,77 @@
+import json
+import sqlite3
+import threading
+
+
+class ConcertCache:
+    """On-disk copy of the concert table, kept current through delta syncs."""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS concert (
+                id TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS concert_date_idx ON concert (date DESC, id DESC);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.conn.commit()
+
+
+    def get_all(self) -> list[dict]:
+        """Return every cached concert, newest first."""
+        with self.lock:
+            rows = self.conn.execute("SELECT data FROM concert ORDER BY date DESC, id DESC").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+
+    def get_page(self, after: tuple[str, str] | None, limit: int) -> list[dict]:
+        """Return up to limit concerts following the (date, id) key, newest first."""
+        query = "SELECT data FROM concert"
+        params = ()
+        if after:
+            query += " WHERE date < ? OR (date = ? AND id < ?)"
+            params = (after[0], after[0], str(after[1]))
+        query += " ORDER BY date DESC, id DESC LIMIT ?"
+
+        with self.lock:
+            rows = self.conn.execute(query, params + (limit,)).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+
+    def get(self, concert_id: str) -> dict | None:
+        """Return a single cached concert by its ID."""
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM concert WHERE id = ?", (str(concert_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+    def get_watermark(self) -> str | None:
+        """Return the server timestamp of the newest change seen so far."""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+
+    def merge(self, rows: list[dict], deleted_ids: list[str] = (), watermark: str | None = None) -> None:
+        """Upsert changed rows, drop deleted ones and advance the sync watermark."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO concert (id, date, data) VALUES (?, ?, ?)",
+                [(str(row["id"]), row["date"], json.dumps(row)) for row in rows]
+            )
+            self.conn.executemany(
+                "DELETE FROM concert WHERE id = ?",
+                [(str(concert_id),) for concert_id in deleted_ids]
+            )
+            if watermark:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)",
+                    (watermark,)
+                )
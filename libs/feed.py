@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+from supabase import acreate_client
+from realtime import RealtimeSubscribeStates
+
+
+class RealtimeFeed:
+    """Applies concert changes made by other clients as they happen, using
+    Supabase realtime (sql/003_concert_realtime.sql). Each event goes through
+    Supabase.apply_remote_change, so the cache, the stats and every change
+    listener are updated exactly as for our own writes. The async client
+    runs on its own event loop in a daemon thread."""
+
+    def __init__(self, supabase, url: str, key: str, on_status=None, max_delay: float = 60):
+        self.supabase = supabase
+        self.url = url
+        self.key = key
+        self.on_status = on_status
+        self.max_delay = max_delay
+        self.client = None
+        self.channel = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="realtime", daemon=True)
+
+
+    def start(self) -> None:
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.connect(), self.loop)
+
+
+    def stop(self) -> None:
+        future = asyncio.run_coroutine_threadsafe(self.disconnect(), self.loop)
+        try:
+            future.result(timeout=2)
+        except Exception:
+            pass  # Shutting down anyway
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+    async def connect(self):
+        # Keep trying while offline, the delta sync picks up whatever was missed
+        delay = 1
+        while True:
+            try:
+                self.client = await acreate_client(self.url, self.key)
+                self.channel = self.client.channel("concert-changes")
+                self.channel.on_postgres_changes("*", schema="public", table="concert", callback=self.on_change)
+                await self.channel.subscribe(self.on_subscribe)
+                return
+            except Exception:
+                self.report(False)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_delay)
+
+
+    async def disconnect(self):
+        if self.client is not None:
+            await self.client.remove_all_channels()
+
+
+    def on_subscribe(self, status, error=None):
+        if status == RealtimeSubscribeStates.SUBSCRIBED:
+            self.report(True)
+            # Events sent while we weren't subscribed (first connect or a reconnect) are gone, sync instead
+            self.loop.run_in_executor(None, self.catch_up)
+        else:
+            self.report(False)
+
+
+    def catch_up(self):
+        # Being subscribed means the server is reachable again, so upload anything journaled too
+        self.supabase.wake_replay()
+        try:
+            self.supabase.sync_concerts()
+        except Exception:
+            pass  # The next sync, on reload or reconnect, tries again
+
+
+    def on_change(self, payload: dict):
+        change = payload.get("data", payload)
+        if change["type"] == "DELETE":
+            # Deletes only carry the primary key
+            self.supabase.apply_remote_change(change["old_record"]["id"], None)
+        else:
+            self.supabase.apply_remote_change(change["record"]["id"], change["record"])
+
+
+    def report(self, connected: bool):
+        if self.on_status is not None:
+            self.on_status(connected)
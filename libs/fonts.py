@@ -0,0 +1,32 @@
+import threading
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+
+# Only the faces the contract template draws with, parsing a TTF costs tens of milliseconds
+CONTRACT_FONTS = ("Lato-Black", "Lato-Bold", "Lato-BoldItalic", "Lato-Italic", "Lato-Regular", "Lato-Semibold")
+
+_lock = threading.Lock()
+_registered = False
+
+
+def register_contract_fonts() -> None:
+    """Register the contract fonts with ReportLab, once per process."""
+    global _registered
+    if _registered:
+        return
+    
+    with _lock:
+        if _registered:
+            return
+        for name in CONTRACT_FONTS:
+            pdfmetrics.registerFont(TTFont(name, f"assets/fonts/{name}.ttf"))
+        _registered = True
+
+
+def prewarm_contract_fonts() -> threading.Thread:
+    """Register the contract fonts on a background thread so the first contract doesn't pay for it."""
+    thread = threading.Thread(target=register_contract_fonts, name="font-prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,94 @@
+from functools import lru_cache
+from typing import Iterable
+
+
+UNITS = (
+    "Zero", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine",
+    "Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"
+)
+TENS = ("", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety")
+
+# (size, name) of the Indian place values, largest first
+SCALES = ((1000000000, "Arab"), (10000000, "Crore"), (100000, "Lakh"), (1000, "Thousand"))
+
+
+def format_indian_number(number: int | str) -> str:
+    """Group the digits of an amount the Indian way (12,34,567).
+    Strings, as typed into an entry, are stripped of everything but digits first."""
+    if not number:
+        return ""
+
+    if isinstance(number, int):
+        return group_digits(abs(number))
+
+    digits = "".join(filter(str.isdecimal, number))
+    if digits.isascii() and not digits.startswith("0"):
+        # The common case, an amount being typed, shares the cache with the integers
+        return group_digits(int(digits)) if digits else ""
+    return group_digit_string(digits)
+
+
+def format_indian_numbers(numbers: Iterable[int | str]) -> list[str]:
+    """format_indian_number for a whole column of amounts, each distinct amount is formatted once."""
+    formatted = {}
+    result = []
+    for number in numbers:
+        text = formatted.get(number)
+        if text is None:
+            text = formatted[number] = format_indian_number(number)
+        result.append(text)
+    return result
+
+
+@lru_cache(maxsize=4096)
+def group_digits(number: int) -> str:
+    if number < 1000:
+        return str(number) if number else ""
+
+    # The last three digits, then pairs
+    head, tail = divmod(number, 1000)
+    parts = [f"{tail:03d}"]
+    while head >= 100:
+        head, pair = divmod(head, 100)
+        parts.append(f"{pair:02d}")
+    parts.append(str(head))
+    parts.reverse()
+    return ",".join(parts)
+
+
+def group_digit_string(digits: str) -> str:
+    # Kept for digit strings that can't round-trip through int: leading zeros and non-ASCII digits
+    if len(digits) <= 3:
+        return digits
+    rest, last_three = digits[:-3], digits[-3:]
+    parts = []
+    while len(rest) > 2:
+        parts.append(rest[-2:])
+        rest = rest[:-2]
+    if rest:
+        parts.append(rest)
+    parts.reverse()
+    return ",".join(parts) + "," + last_three
+
+
+def number_to_words(num: int) -> str:
+    """Spell out an amount the Indian way, as printed on the contract."""
+    try:
+        return "Rupees " + integer_to_words(num) + " Only"
+    except ValueError:
+        return ""
+
+
+@lru_cache(maxsize=1024)
+def integer_to_words(n: int) -> str:
+    if n < 20:
+        return UNITS[n]
+    if n < 100:
+        return TENS[n // 10] + (" " + UNITS[n % 10] if n % 10 != 0 else "")
+    if n < 1000:
+        return UNITS[n // 100] + " Hundred" + (" And " + integer_to_words(n % 100) if n % 100 != 0 else "")
+    for size, name in SCALES:
+        if n >= size:
+            # Arab is the largest name, anything bigger is counted in Arabs
+            head, rest = divmod(n, size)
+            return integer_to_words(head) + " " + name + (" " + integer_to_words(rest) if rest != 0 else "")
@@ -0,0 +1,58 @@
+import queue
+import threading
+
+from libs.worker import BackgroundRunner
+from libs.utils import generate_contract_pdf
+from libs.models import Concert
+
+
+class ContractQueue:
+    """Renders contract PDFs on a background thread, so saving a concert
+    never waits on, or fails because of, its contract."""
+
+    def __init__(self, runner: BackgroundRunner, retries: int = 3, retry_delay: float = 2):
+        self.runner = runner
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.jobs = queue.Queue()
+        self.listeners = []
+        self.thread = threading.Thread(target=self.work, name="contracts", daemon=True)
+        self.thread.start()
+
+
+    def enqueue(self, concert: Concert, paid_in_full: bool = False) -> None:
+        """Queue a contract for rendering. Listeners hear about the outcome on the Tk thread."""
+        self.jobs.put((concert, paid_in_full, 1))
+
+
+    def subscribe(self, callback) -> None:
+        """callback(concert, file_path, error) is called on the Tk thread after every job,
+        with error set (and file_path None) once all retries have failed."""
+        self.listeners.append(callback)
+
+
+    @property
+    def pending(self) -> int:
+        return self.jobs.qsize()
+
+
+    def work(self):
+        while True:
+            concert, paid_in_full, attempt = self.jobs.get()
+            try:
+                file_path = generate_contract_pdf(concert, paid_in_full)
+            except Exception as e:
+                if attempt < self.retries:
+                    # Requeue after a pause instead of sleeping, so other contracts keep flowing
+                    timer = threading.Timer(self.retry_delay * attempt, self.jobs.put, args=((concert, paid_in_full, attempt + 1),))
+                    timer.daemon = True
+                    timer.start()
+                else:
+                    self.notify(concert, None, e)
+            else:
+                self.notify(concert, file_path, None)
+
+
+    def notify(self, concert: Concert, file_path: str | None, error: Exception | None):
+        for callback in self.listeners:
+            self.runner.post(callback, concert, file_path, error)
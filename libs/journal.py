@@ -0,0 +1,176 @@
+import json
+import sqlite3
+import threading
+
+
+class MutationJournal:
+    """Concert changes made locally that the server hasn't confirmed yet, kept
+    on disk so they survive connection drops and restarts. Each entry records
+    the updated_at of the row it was made against (base), so the upload can
+    tell whether someone else changed the row in the meantime."""
+
+    PENDING = "pending"
+    CONFLICT = "conflict"
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS mutation (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                concert_id TEXT NOT NULL,
+                op TEXT NOT NULL,
+                data TEXT,
+                base TEXT,
+                force INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS mutation_concert_idx ON mutation (concert_id);
+        """)
+        self.conn.commit()
+
+
+    def append(self, entries: list[tuple[str, str, dict | None, str | None]]) -> None:
+        """Journal (op, concert_id, data, base) entries in one transaction.
+        op is "upsert" (data is the full row) or "delete" (data is None)."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO mutation (concert_id, op, data, base) VALUES (?, ?, ?, ?)",
+                [
+                    (str(concert_id), op, json.dumps(data) if data is not None else None, base)
+                    for op, concert_id, data, base in entries
+                ]
+            )
+
+
+    def pending(self, max_concerts: int) -> list[dict]:
+        """Return the pending entries of the max_concerts concerts changed longest ago, oldest first.
+        All entries of a concert are returned together so they're uploaded together."""
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT seq, concert_id, op, data, base, force FROM mutation
+                WHERE status = 'pending' AND concert_id IN (
+                    SELECT concert_id FROM mutation WHERE status = 'pending'
+                    GROUP BY concert_id ORDER BY MIN(seq) LIMIT ?
+                )
+                ORDER BY seq
+            """, (max_concerts,)).fetchall()
+        return [
+            {
+                "seq": seq,
+                "concert_id": concert_id,
+                "op": op,
+                "data": json.loads(data) if data is not None else None,
+                "base": base,
+                "force": bool(force),
+            }
+            for seq, concert_id, op, data, base, force in rows
+        ]
+
+
+    def held_ids(self) -> set[str]:
+        """IDs of concerts whose local row mustn't be overwritten by the server's, pending or in conflict."""
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT concert_id FROM mutation").fetchall()
+        return {concert_id for (concert_id,) in rows}
+
+
+    def has_pending(self, concert_id: str) -> bool:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM mutation WHERE concert_id = ? AND status = 'pending' LIMIT 1", (str(concert_id),)
+            ).fetchone()
+        return row is not None
+
+
+    def counts(self) -> dict:
+        """Number of entries per status."""
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM mutation GROUP BY status").fetchall()
+        counts = {self.PENDING: 0, self.CONFLICT: 0}
+        counts.update(rows)
+        return counts
+
+
+    def remove(self, seqs: list[int]) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM mutation WHERE seq = ?", [(seq,) for seq in seqs])
+
+
+    def mark_conflict(self, seqs: list[int], error: str | None = None) -> None:
+        """Set entries aside until the user decides between their version and the server's."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE mutation SET status = 'conflict', error = ? WHERE seq = ?",
+                [(error, seq) for seq in seqs]
+            )
+
+
+    def rebase(self, concert_id: str, base: str | None) -> None:
+        """Point the remaining entries of a concert at the server version just uploaded."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE mutation SET base = ? WHERE concert_id = ? AND status = 'pending'", (base, str(concert_id))
+            )
+
+
+    def requeue(self, concert_id: str) -> None:
+        """Upload a concert's conflicting entries anyway, overwriting the server's version."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE mutation SET status = 'pending', force = 1, error = NULL WHERE concert_id = ? AND status = 'conflict'",
+                (str(concert_id),)
+            )
+
+
+    def discard(self, concert_id: str) -> None:
+        """Drop every entry of a concert."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM mutation WHERE concert_id = ?", (str(concert_id),))
+
+
+class JournalReplayer:
+    """Uploads the journal in the background. It wakes up whenever a change is
+    journaled, and every interval seconds in case the connection came back."""
+
+    def __init__(self, supabase, on_conflict=None, on_pending=None, interval: float = 15, batch_size: int = 50):
+        self.supabase = supabase
+        self.on_conflict = on_conflict
+        self.on_pending = on_pending
+        self.interval = interval
+        self.batch_size = batch_size
+        self.event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="journal", daemon=True)
+
+
+    def start(self) -> None:
+        self.thread.start()
+
+
+    def wake(self) -> None:
+        self.event.set()
+
+
+    def run(self):
+        while True:
+            self.report()
+            try:
+                while True:
+                    flushed, conflicts = self.supabase.flush_journal(self.batch_size)
+                    for entry in conflicts:
+                        if self.on_conflict is not None:
+                            self.on_conflict(entry)
+                    self.report()
+                    if not flushed and not conflicts:
+                        break
+            except Exception:
+                pass  # Still offline (or the circuit breaker is open), try again later
+
+            self.event.wait(self.interval)
+            self.event.clear()
+
+
+    def report(self):
+        if self.on_pending is not None:
+            self.on_pending(self.supabase.journal.counts())
@@ -0,0 +1,92 @@
+from datetime import date, time
+
+
+class Concert:
+    """A concert, built once from its database row where it leaves the data
+    layer (libs/supabase_client.py), with the date and time already parsed
+    and the amounts as integers. Treat it as immutable and use replace to
+    change fields, so a concert can be shared between pages and threads."""
+
+    __slots__ = (
+        "id", "organizer", "venue", "city", "district", "date", "time", "is_sound_included",
+        "total", "advance", "contact", "note", "is_cancelled", "updated_at",
+    )
+
+    def __init__(self, id: str, organizer: str | None = None, venue: str | None = None, city: str | None = None,
+                 district: str | None = None, date: date | None = None, time: time | None = None,
+                 is_sound_included: bool = False, total: int = 0, advance: int = 0, contact: str | None = None,
+                 note: str | None = None, is_cancelled: bool = False, updated_at: str | None = None):
+        self.id = str(id)
+        self.organizer = organizer
+        self.venue = venue
+        self.city = city
+        self.district = district
+        self.date = date
+        self.time = time
+        self.is_sound_included = is_sound_included
+        self.total = total
+        self.advance = advance
+        self.contact = contact
+        self.note = note
+        self.is_cancelled = is_cancelled
+        self.updated_at = updated_at
+
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Concert":
+        """Parse a row as returned by PostgREST (ISO date and time strings)."""
+        return cls(
+            row["id"],
+            row.get("organizer"),
+            row.get("venue"),
+            row.get("city"),
+            row.get("district"),
+            date.fromisoformat(row["date"]) if row.get("date") else None,
+            time.fromisoformat(row["time"]) if row.get("time") else None,
+            bool(row.get("is_sound_included")),
+            int(row.get("total") or 0),
+            int(row.get("advance") or 0),
+            row.get("contact"),
+            row.get("note"),
+            bool(row.get("is_cancelled")),
+            row.get("updated_at"),
+        )
+
+
+    def to_row(self) -> dict:
+        """The database row for this concert, updated_at is left to the database."""
+        return {
+            "id": self.id,
+            "organizer": self.organizer,
+            "venue": self.venue,
+            "city": self.city,
+            "district": self.district,
+            "date": self.date.isoformat() if self.date else None,
+            "time": self.time.isoformat() if self.time else None,
+            "is_sound_included": self.is_sound_included,
+            "total": self.total,
+            "advance": self.advance,
+            "contact": self.contact,
+            "note": self.note,
+            "is_cancelled": self.is_cancelled,
+        }
+
+
+    def replace(self, **changes) -> "Concert":
+        """Return a copy with the given fields changed."""
+        concert = Concert.__new__(Concert)
+        for name in self.__slots__:
+            setattr(concert, name, changes.pop(name, getattr(self, name)))
+        if changes:
+            raise TypeError(f"Concert has no field {next(iter(changes))!r}")
+        return concert
+
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Concert):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+    def __repr__(self) -> str:
+        return f"Concert({self.id!r}, {self.organizer!r}, {self.date})"
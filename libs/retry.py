@@ -0,0 +1,175 @@
+import time
+import random
+import threading
+from functools import wraps
+
+import httpx
+from postgrest.exceptions import APIError
+
+
+# Postgres SQLSTATE classes worth retrying: connection exceptions, transaction
+# rollbacks (deadlocks, serialization failures), insufficient resources and
+# operator intervention (statement timeouts, admin shutdown)
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")
+TRANSIENT_HTTP_STATUSES = ("408", "425", "429", "500", "502", "503", "504")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the database while the circuit breaker is open."""
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether an error might go away on its own, as opposed to e.g. a constraint violation."""
+    if isinstance(error, httpx.TransportError):
+        return True
+
+    if isinstance(error, APIError):
+        code = str(error.code or "")
+        return code.startswith(TRANSIENT_SQLSTATE_CLASSES) or code in TRANSIENT_HTTP_STATUSES
+
+    return False
+
+
+class CircuitBreaker:
+    """Fails fast after repeated transient failures, then lets a single
+    trial call through once reset_timeout has passed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+
+
+    def before_call(self) -> None:
+        with self.lock:
+            if self.state == self.CLOSED:
+                return
+
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+                return
+
+            raise CircuitOpenError(f"The database is unreachable, trying again in {max(remaining, 0):.0f} seconds.")
+
+
+    def release_trial(self) -> None:
+        """End a trial call that says nothing about the database (e.g. a bug in
+        handling its result), so the next call is let through as a new trial."""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+            }
+
+
+class RetryMetrics:
+    """Per-function counters for calls, retries, waits and give-ups."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.functions = {}
+
+
+    def record(self, name: str, **deltas) -> None:
+        with self.lock:
+            counters = self.functions.setdefault(name, {
+                "calls": 0, "retries": 0, "failures": 0, "permanent_errors": 0, "rejected": 0, "wait_seconds": 0.0
+            })
+            for key, value in deltas.items():
+                counters[key] += value
+
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {name: dict(counters) for name, counters in self.functions.items()}
+
+
+breaker = CircuitBreaker()
+metrics = RetryMetrics()
+
+
+def retry_on_db_error(retries: int = 4, base_delay: float = 1, max_delay: float = 20, deadline: float = 45):
+    """
+    Decorator to retry a function upon encountering a transient database error.
+    Waits grow exponentially with full jitter, and no retry is started past the
+    deadline (seconds since the first attempt). Permanent errors are raised
+    straight away, and while the shared circuit breaker is open calls fail fast.
+    """
+    def decorator(func):
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics.record(name, calls=1)
+            started = time.monotonic()
+            attempt = 0
+            while True:
+                try:
+                    breaker.before_call()
+                except CircuitOpenError:
+                    metrics.record(name, rejected=1)
+                    raise
+
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    if not is_transient(e):
+                        if isinstance(e, APIError):
+                            # The server answered, so it is up even if the request was bad
+                            breaker.record_success()
+                            metrics.record(name, permanent_errors=1)
+                        else:
+                            breaker.release_trial()
+                        raise
+
+                    breaker.record_failure()
+                    attempt += 1
+                    wait = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+                    if attempt >= retries or time.monotonic() - started + wait > deadline:
+                        metrics.record(name, failures=1)
+                        raise
+
+                    metrics.record(name, retries=1, wait_seconds=wait)
+                    time.sleep(wait)
+                except BaseException:
+                    # Interrupted, the half-open breaker mustn't wait for an outcome that never comes
+                    breaker.release_trial()
+                    raise
+                else:
+                    breaker.record_success()
+                    return result
+        return wrapper
+    return decorator
@@ -0,0 +1,145 @@
+import re
+from bisect import bisect_left, insort
+
+from libs.models import Concert
+
+
+SEARCH_FIELDS = ("organizer", "venue", "city", "district", "contact", "note")
+
+# Prefixes up to this length get their own posting sets, as one or two letters
+# match too many distinct words to union on every keystroke
+SHORT_PREFIX = 2
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+class SearchIndex:
+    """In-memory inverted index over the text fields of concerts.
+    Every word of a query has to match the start of a word in one of the
+    fields, so "utt spo" finds "Uttarpara Sporting Club"."""
+
+    def __init__(self, fields: tuple[str, ...] = SEARCH_FIELDS):
+        self.fields = fields
+        self.tokens_by_id = {}
+        self.ids_by_token = {}
+        self.ids_by_prefix = {}
+        self.sorted_tokens = []
+
+
+    def __len__(self) -> int:
+        return len(self.tokens_by_id)
+
+
+    def add_many(self, concerts: dict[str, Concert]) -> None:
+        """Index many concerts at once, sorting the words once at the end instead of per new word."""
+        self.sorted_tokens = None
+        for concert_id, concert in concerts.items():
+            self.add(concert_id, concert)
+        self.sorted_tokens = sorted(self.ids_by_token)
+
+
+    def add(self, concert_id: str, concert: Concert) -> None:
+        """Index a concert, replacing whatever was indexed for it before."""
+        tokens = set()
+        for field in self.fields:
+            value = getattr(concert, field)
+            if value:
+                tokens.update(tokenize(str(value)))
+
+        old = self.tokens_by_id.get(concert_id)
+        if old == tokens:
+            return
+        self.tokens_by_id[concert_id] = tokens
+        if old is not None:
+            self.unlink(concert_id, old - tokens)
+            tokens_to_add = tokens - old
+        else:
+            tokens_to_add = tokens
+
+        for token in tokens_to_add:
+            ids = self.ids_by_token.get(token)
+            if ids is None:
+                ids = self.ids_by_token[token] = set()
+                if self.sorted_tokens is not None:
+                    insort(self.sorted_tokens, token)
+            ids.add(concert_id)
+            for length in range(1, min(len(token), SHORT_PREFIX) + 1):
+                self.ids_by_prefix.setdefault(token[:length], set()).add(concert_id)
+
+
+    def remove(self, concert_id: str) -> None:
+        tokens = self.tokens_by_id.pop(concert_id, None)
+        if tokens:
+            self.unlink(concert_id, tokens)
+
+
+    def clear(self) -> None:
+        self.tokens_by_id.clear()
+        self.ids_by_token.clear()
+        self.ids_by_prefix.clear()
+        # None while add_many is running
+        self.sorted_tokens = []
+
+
+    def unlink(self, concert_id: str, tokens: set[str]):
+        prefixes = set()
+        for token in tokens:
+            ids = self.ids_by_token[token]
+            ids.discard(concert_id)
+            if not ids:
+                del self.ids_by_token[token]
+                if self.sorted_tokens is not None:
+                    del self.sorted_tokens[bisect_left(self.sorted_tokens, token)]
+            prefixes.update(token[:length] for length in range(1, min(len(token), SHORT_PREFIX) + 1))
+
+        # Several of the removed words may share a prefix, and another word of the same concert may keep it
+        remaining = self.tokens_by_id.get(concert_id, ())
+        for prefix in prefixes:
+            if any(other.startswith(prefix) for other in remaining):
+                continue
+            ids = self.ids_by_prefix.get(prefix)
+            if ids is None:
+                continue
+            ids.discard(concert_id)
+            if not ids:
+                del self.ids_by_prefix[prefix]
+
+
+    def search(self, query: str) -> set[str] | None:
+        """Return the IDs of concerts matching every word of the query,
+        or None if the query has no words (no filter). Treat the set as read only."""
+        words = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not words:
+            return None
+
+        # Longest words first, they're the most selective
+        result = None
+        for word in words:
+            if result is not None and len(result) < 64:
+                # Checking the few remaining candidates beats collecting every match of the word
+                result = {
+                    concert_id for concert_id in result
+                    if any(token.startswith(word) for token in self.tokens_by_id[concert_id])
+                }
+            else:
+                matches = self.lookup(word)
+                result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result
+
+
+    def lookup(self, prefix: str) -> set[str]:
+        if len(prefix) <= SHORT_PREFIX:
+            return self.ids_by_prefix.get(prefix, set())
+
+        matches = set()
+        index = bisect_left(self.sorted_tokens, prefix)
+        while index < len(self.sorted_tokens) and self.sorted_tokens[index].startswith(prefix):
+            matches.update(self.ids_by_token[self.sorted_tokens[index]])
+            index += 1
+        return matches
@@ -0,0 +1,197 @@
+import time
+import threading
+from datetime import date
+
+from libs.data import Districts
+from libs.models import Concert
+
+
+# Seconds before retrying a failed recount that nobody asked for, doubled per failure up to the ttl
+RETRY_AFTER = 30
+
+
+class StatsAggregator:
+    """Year, district and month counts kept current by applying per-row deltas,
+    so the stats only need a full recount when explicitly refreshed."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.year = None
+        self.year_stats = {}
+        self.district_stats = {}
+        self.month_stats = {}
+
+
+    @property
+    def is_seeded(self) -> bool:
+        # A new year moves every bucket, so the counts have to be rebuilt
+        return self.year == date.today().year
+
+
+    def seed(self, year_stats: dict, district_stats: dict, month_stats: dict) -> None:
+        """Replace the counts with a full recount from the database."""
+        with self.lock:
+            self.year = date.today().year
+            self.year_stats = dict(year_stats)
+            self.district_stats = dict(district_stats)
+            self.month_stats = dict(month_stats)
+
+
+    def invalidate(self) -> None:
+        """Forget the counts so the next read does a full recount."""
+        with self.lock:
+            self.year = None
+
+
+    def apply(self, old: Concert | None, new: Concert | None) -> None:
+        """Move a concert out of the buckets of its old row and into those of its new row.
+        Pass None as old for an insert and as new for a delete."""
+        with self.lock:
+            if self.year is None:
+                return
+            self.count(old, -1)
+            self.count(new, 1)
+
+
+    def count(self, concert: Concert | None, delta: int) -> None:
+        if concert is None or concert.is_cancelled:
+            return
+
+        year = concert.date.year
+        if year == self.year - 1:
+            self.year_stats["previous"] += delta
+        elif year == self.year:
+            self.year_stats["current"] += delta
+
+            district = concert.district if concert.district is not None else "Other"
+            self.district_stats[district] = self.district_stats.get(district, 0) + delta
+
+            month = concert.date.month
+            self.month_stats[month] = self.month_stats.get(month, 0) + delta
+
+
+    def snapshot(self) -> tuple[dict, dict, dict]:
+        """Return copies of the counts in the shape returned by Supabase.get_stats."""
+        with self.lock:
+            year_stats = dict(self.year_stats)
+            district_stats = {district: 0 for district in Districts}
+            district_stats.update(self.district_stats)
+            month_stats = dict(self.month_stats)
+
+        district_stats = dict(sorted(district_stats.items(), key=lambda x: x[1], reverse=True))
+        return year_stats, district_stats, month_stats
+
+
+class StatsStore:
+    """A single stats snapshot shared by every page that shows stats.
+    Pages subscribe and redraw whenever a new snapshot is published.
+    Concurrent refresh requests share one fetch, and the snapshot is
+    recounted from the database once it is older than ttl seconds.
+    When such a recount fails, e.g. offline, the locally kept counts are
+    published instead and the recount is retried later. Only an explicit
+    refresh reports the error then.
+    Apart from invalidate, call it from the Tk thread only."""
+
+    def __init__(self, supabase, runner, ttl: float = 300):
+        self.supabase = supabase
+        self.runner = runner
+        self.ttl = ttl
+        self.snapshot = None
+        self.fetched_at = 0.0  # time of the last full recount
+        self.retry_at = 0.0  # no recount before this time unless forced
+        self.backoff = 0.0
+        self.stale = True
+        self.in_flight = False
+        self.rerun = None
+        self.subscribers = []
+        self.error_subscribers = []
+
+        # Every mutation in the data layer marks the snapshot stale
+        supabase.add_listener(lambda old, new: self.invalidate())
+
+
+    def subscribe(self, callback, on_error=None) -> None:
+        """callback(stats) gets every published snapshot, on_error(exception) every failed refresh."""
+        self.subscribers.append(callback)
+        if on_error is not None:
+            self.error_subscribers.append(on_error)
+        if self.snapshot is not None:
+            callback(self.snapshot)
+
+
+    def refresh(self, force: bool = False, report: bool = True) -> None:
+        """Publish a current snapshot, fetching only if it's stale, expired or forced.
+        With report=False a failure with nothing to show isn't passed to on_error."""
+        if self.in_flight:
+            # Coalesce, but fetch again afterwards as the running fetch may predate the request
+            self.rerun = bool(self.rerun) or force
+            return
+        
+        now = time.monotonic()
+        expired = now - self.fetched_at > self.ttl and now >= self.retry_at
+        if self.snapshot is not None and not (force or expired or self.stale):
+            self.publish(self.snapshot)
+            return
+
+        self.in_flight = True
+        self.stale = False
+        # Expiry means a full recount, a mutation only needs the incrementally maintained counts
+        recount = force or expired
+        self.runner.submit(
+            self.supabase.get_stats, recount,
+            on_success=lambda stats: self.on_fetched(stats, recount),
+            on_error=lambda error: self.on_failed(error, force, report)
+        )
+
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale and refresh subscribers. Safe to call from any thread."""
+        self.runner.post(self.on_invalidated)
+
+
+    def on_invalidated(self):
+        self.stale = True
+        self.refresh(report=False)
+
+
+    def on_fetched(self, stats: tuple[dict, dict, dict], recount: bool):
+        self.in_flight = False
+        if recount:
+            self.fetched_at = time.monotonic()
+            self.retry_at = self.backoff = 0.0
+        self.publish(stats)
+        self.run_again()
+
+
+    def on_failed(self, error: Exception, force: bool, report: bool):
+        self.in_flight = False
+        if not force and self.supabase.stats.is_seeded:
+            # Only an expired recount can fail here, the mutations are still in the local counts
+            self.backoff = min(self.backoff * 2 or RETRY_AFTER, self.ttl)
+            self.retry_at = time.monotonic() + self.backoff
+            self.publish(self.supabase.stats.snapshot())
+        else:
+            self.stale = True
+            if force or report:
+                self.report(error)
+        self.run_again()
+
+
+    def report(self, error: Exception):
+        for callback in self.error_subscribers:
+            callback(error)
+        if not self.error_subscribers:
+            self.runner.show_error(error)
+
+
+    def run_again(self):
+        if self.rerun is not None:
+            force, self.rerun = self.rerun, None
+            self.stale = True
+            self.refresh(force, report=force)
+
+
+    def publish(self, stats: tuple[dict, dict, dict]):
+        self.snapshot = stats
+        for callback in self.subscribers:
+            callback(stats)
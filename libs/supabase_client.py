@@ -1,67 +1,227 @@
-from datetime import datetime, date
+import threading
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
 
 from supabase import create_client
-from postgrest.types import CountMethod
+from postgrest.exceptions import APIError
 
-from libs.utils import retry_on_db_error
+from libs.retry import retry_on_db_error, is_transient
+from libs.timing import instrument
+from libs.backends import ConcertBackend, PostgrestBackend
 from libs.data import Districts
+from libs.cache import ConcertCache
+from libs.journal import MutationJournal, JournalReplayer
+from libs.stats import StatsAggregator
+from libs.models import Concert
 
 
+# What the concert list shows and searches, leaving out wide fields like note
+LIST_COLUMNS = (
+    "id", "organizer", "venue", "city", "district", "date", "time",
+    "is_sound_included", "total", "advance", "contact", "is_cancelled", "updated_at",
+)
+
+
+# A row is stamped when it's written but only visible once its transaction
+# commits, so a sync can see a later stamped row first. Each sync asks again
+# for this much before the watermark, pulling a row twice does no harm.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def to_concert(row: dict | None) -> Concert | None:
+    return Concert.from_row(row) if row is not None else None
+
+
+def sync_since(watermark: str | None) -> str | None:
+    if not watermark:
+        return None
+    try:
+        return (datetime.fromisoformat(watermark) - SYNC_OVERLAP).isoformat()
+    except ValueError:
+        return watermark
+
+
+@instrument
 class Supabase:
-    def __init__(self, url: str, key: str):
-        self.client = create_client(url, key)
+    def __init__(self, url: str, key: str, cache_path: str | None = None, client=None, backend: ConcertBackend | None = None):
+        """The concert table is read and written through backend (libs/backends.py),
+        by default the Supabase project at url. client replaces the Supabase client
+        of that default, e.g. with the benchmarks' stand-in (benchmarks/standin.py)."""
+        self.url = url
+        self.key = key
+        if backend is None:
+            backend = PostgrestBackend(client if client is not None else create_client(url, key))
+        self.backend = backend
+        self.cache = ConcertCache(cache_path) if cache_path else None
+        # Writes go through the journal whenever there is a local cache to apply them to
+        self.journal = MutationJournal(cache_path) if cache_path else None
+        self.replayer = None
+        self.stats = StatsAggregator()
+        self.listeners = []
+        # Syncs, our own writes and realtime events all read the old row before merging the new one
+        self.lock = threading.RLock()
+        self.feed = None
+        # Full rows fetched on demand when there is no local cache to read them from
+        self.details = OrderedDict()
+        self.max_details = 500
+
+
+    def add_listener(self, callback) -> None:
+        """Register callback(old, new) to be called with the old and new Concert for every
+        concert that changes, whether by this client or pulled in by a sync. It runs on the
+        calling (usually a background) thread, new is None for a delete and old is None
+        for an insert. Without a local cache the old concert isn't known, old is then None,
+        or only holds the id for a delete."""
+        self.listeners.append(callback)
+
+
+    def subscribe_changes(self, on_status=None):
+        """Start applying other clients' changes as they happen (see libs/feed.py).
+        on_status(connected) is called from the feed's thread whenever the subscription goes up or down."""
+        from libs.feed import RealtimeFeed
+
+        if self.feed is None:
+            self.feed = RealtimeFeed(self, self.url, self.key, on_status)
+            self.feed.start()
+        return self.feed
+
+
+    def unsubscribe_changes(self) -> None:
+        if self.feed is not None:
+            self.feed.stop()
+            self.feed = None
+
+
+    def notify(self, old: Concert | None, new: Concert | None) -> None:
+        for callback in self.listeners:
+            callback(old, new)
+
+
+    def start_replay(self, on_conflict=None, on_pending=None):
+        """Start uploading journaled changes in the background (see libs/journal.py).
+        on_conflict(entry) and on_pending(counts) are called from the replayer's thread."""
+        if self.journal is not None and self.replayer is None:
+            self.replayer = JournalReplayer(self, on_conflict, on_pending)
+            self.replayer.start()
+        return self.replayer
+
+
+    def wake_replay(self) -> None:
+        if self.replayer is not None:
+            self.replayer.wake()
+
+
+    def get_concerts(self, columns: tuple[str, ...] | None = None) -> list[Concert]:
+        """Fetch all concerts, syncing the local cache first when one is configured.
+        Pass columns (e.g. LIST_COLUMNS) to fetch only those, the other fields are then None.
+        The local cache always holds full rows, so columns only matters without one."""
+        if self.cache is None:
+            return self.fetch_concerts(columns)
+        
+        self.sync_concerts()
+        return [Concert.from_row(row) for row in self.cache.get_all()]
+
+
+    def get_cached_concerts(self) -> list[Concert]:
+        """Return the concerts stored on disk without touching the network."""
+        return [Concert.from_row(row) for row in self.cache.get_all()] if self.cache else []
+
 
     @retry_on_db_error()
-    def get_concerts(self) -> list[dict]:
-        """Fetch all concerts from the database."""
-        response = self.client.table("concert").select("*").order("date", desc=True).execute()
-        return response.data if response.data else []
+    def fetch_concerts(self, columns: tuple[str, ...] | None = None) -> list[Concert]:
+        """Fetch all concerts from the database, or only the given columns of them."""
+        return [Concert.from_row(row) for row in self.backend.select_concerts(columns)]
 
 
     @retry_on_db_error()
-    def get_stats(self) -> tuple[dict, dict, dict]:
-        """Fetch yearly and monthly stats from the database."""
-        # Get current year and month
-        year_min = f"{date.today().year - 1}-01-01"
-        year_max = f"{date.today().year}-01-01"
-
-        response = (self.client.table("concert")
-                               .select("id, date", count=CountMethod.exact)
-                               .eq("is_cancelled", False)
-                               .gte("date", year_min)
-                               .lt("date", year_max)
-                               .execute())
-        
-        year_stats = {}
-        year_stats["previous"] = response.count if response.count else 0
-
-        year_min = f"{date.today().year}-01-01"
-        year_max = f"{date.today().year + 1}-01-01"
-
-        response = (self.client.table("concert")
-                               .select("id, date, district", count=CountMethod.exact)
-                               .eq("is_cancelled", False)
-                               .gte("date", year_min)
-                               .lt("date", year_max)
-                               .execute())
-        
-        year_stats["current"] =  response.count if response.count else 0
-        
-        district_stats = {}
-        month_stats = {}
-        for concert in response.data:
-            # Count concerts by district
-            district = concert["district"] if concert["district"] is not None else "Other"
-            if district not in district_stats:
-                district_stats[district] = 0
-            district_stats[district] += 1
+    def get_concerts_page(self, after: tuple[date, str] | None = None, limit: int = 100,
+                          columns: tuple[str, ...] | None = None) -> list[Concert]:
+        """Fetch the next page of concerts ordered by date (newest first),
+        starting after the (date, id) key of the last concert already shown.
+        columns works as for get_concerts."""
+        if after:
+            after = (str(after[0]), str(after[1]))
+
+        if self.cache is not None:
+            return [Concert.from_row(row) for row in self.cache.get_page(after, limit)]
+        
+        return [Concert.from_row(row) for row in self.backend.select_page(after, limit, columns)]
+
+
+    @retry_on_db_error()
+    def sync_concerts(self) -> bool:
+        """Pull rows changed or deleted since the last sync into the local cache.
+        Returns True if anything changed."""
+        if self.cache is None:
+            return False
+        
+        watermark = self.cache.get_watermark()
+
+        # From a little before the watermark, so rows committed late are never missed
+        rows, tombstones = self.backend.select_changes(sync_since(watermark))
+
+        # Timestamps come from the server clock, so local clock skew doesn't matter
+        stamps = [row["updated_at"] for row in rows] + [row["deleted_at"] for row in tombstones]
+        new_watermark = max(stamps + [watermark] if watermark else stamps, default=None)
+
+        with self.lock:
+            # Rows with journaled changes keep their local version until the upload settles them
+            if self.journal is not None:
+                held = self.journal.held_ids()
+                rows = [row for row in rows if str(row["id"]) not in held]
+                tombstones = [row for row in tombstones if str(row["id"]) not in held]
+
+            # A row that exists now was recreated after its tombstone, the select sees current rows only
+            present = {str(row["id"]) for row in rows}
+            tombstones = [row for row in tombstones if str(row["id"]) not in present]
+
+            # Our own writes and realtime events are already in the cache, only rows that differ count as changes
+            changes = []
+            for row in rows:
+                old = self.cache.get(row["id"])
+                if old != row:
+                    changes.append((old, row))
+            for row in tombstones:
+                old = self.cache.get(row["id"])
+                if old is not None:
+                    changes.append((old, None))
+            changes = [(to_concert(old), to_concert(new)) for old, new in changes]
             
-            # Count concerts by month
-            date_obj = datetime.strptime(concert["date"], "%Y-%m-%d")
-            month = int(date_obj.strftime("%m"))
-            if month not in month_stats:
-                month_stats[month] = 0
-            month_stats[month] += 1
+            for old, new in changes:
+                self.stats.apply(old, new)
+
+            self.cache.merge(rows, [row["id"] for row in tombstones], new_watermark)
+            for old, new in changes:
+                self.notify(old, new)
+        return bool(changes)
+
+
+    def get_stats(self, refresh: bool = False) -> tuple[dict, dict, dict]:
+        """Return yearly, district and monthly stats.
+        The counts are fetched once and then kept current by every mutation,
+        pass refresh=True to force a full recount."""
+        if refresh or not self.stats.is_seeded:
+            # Catch up on other clients' changes first so the sync doesn't count them twice
+            self.sync_concerts()
+            self.stats.seed(*self.fetch_stats())
+        return self.stats.snapshot()
+
+
+    @retry_on_db_error()
+    def fetch_stats(self) -> tuple[dict, dict, dict]:
+        """Fetch yearly and monthly stats from the database.
+        The counting is done server side by the concert_stats function (sql/002_concert_stats.sql)."""
+        stats = self.backend.concert_stats(date.today().year)
+
+        year_stats = {
+            "previous": stats.get("previous") or 0,
+            "current": stats.get("current") or 0,
+        }
+        
+        district_stats = dict(stats.get("districts") or {})
+
+        # JSON object keys are always strings
+        month_stats = {int(month): count for month, count in (stats.get("months") or {}).items()}
         
         # Fill missing districts with 0
         for district in Districts:
@@ -78,25 +238,284 @@ class Supabase:
         return year_stats, district_stats, month_stats
     
 
-    @retry_on_db_error()
-    def save_concert(self, concert: dict) -> None:
-        """Insert or update a concert in the database."""
-        self.client.table("concert").upsert(concert, on_conflict="id").execute()
+    def save_concert(self, concert: Concert) -> None:
+        """Insert or update a concert. With a local cache the change is journaled,
+        applied locally straight away and uploaded in the background."""
+        self.save_concerts([concert])
 
 
-    @retry_on_db_error()
-    def cancel_concert(self, concert_id: int) -> None:
+    def cancel_concert(self, concert_id: str) -> None:
         """Cancel a concert by its ID."""
-        self.client.table("concert").update({"is_cancelled": True}).eq("id", concert_id).execute()
+        self.cancel_concerts([concert_id])
     
 
-    @retry_on_db_error()
-    def restore_concert(self, concert_id: int) -> None:
+    def restore_concert(self, concert_id: str) -> None:
         """Restore a cancelled concert by its ID."""
-        self.client.table("concert").update({"is_cancelled": False}).eq("id", concert_id).execute()
+        self.restore_concerts([concert_id])
     
 
-    @retry_on_db_error()
-    def delete_concert(self, concert_id: int) -> None:
+    def delete_concert(self, concert_id: str) -> None:
         """Delete a concert by its ID."""
-        self.client.table("concert").delete().eq("id", concert_id).execute()
\ No newline at end of file
+        self.delete_concerts([concert_id])
+
+
+    def save_concerts(self, concerts: list[Concert]) -> None:
+        """Insert or update several concerts in a single request."""
+        if not concerts:
+            return
+        rows = [concert.to_row() for concert in concerts]
+        if self.journal is not None:
+            self.record([("upsert", row["id"], row) for row in rows])
+        else:
+            self.upsert_concerts(rows)
+
+
+    def cancel_concerts(self, concert_ids: list[str]) -> None:
+        """Cancel several concerts in a single request."""
+        self.set_cancelled(concert_ids, True)
+
+
+    def restore_concerts(self, concert_ids: list[str]) -> None:
+        """Restore several cancelled concerts in a single request."""
+        self.set_cancelled(concert_ids, False)
+
+
+    def delete_concerts(self, concert_ids: list[str]) -> None:
+        """Delete several concerts in a single request."""
+        if not concert_ids:
+            return
+        if self.journal is not None:
+            self.record([("delete", concert_id, None) for concert_id in concert_ids])
+        else:
+            self.remove_concerts(concert_ids)
+
+
+    def set_cancelled(self, concert_ids: list[str], is_cancelled: bool) -> None:
+        rows = {concert_id: self.cache.get(concert_id) for concert_id in concert_ids} if self.journal is not None else {}
+        journaled = [("upsert", concert_id, dict(row, is_cancelled=is_cancelled)) for concert_id, row in rows.items() if row is not None]
+        if journaled:
+            self.record(journaled)
+        
+        # Rows we don't have locally can only be changed on the server
+        uncached = [concert_id for concert_id in concert_ids if rows.get(concert_id) is None]
+        if uncached:
+            self.update_cancelled(uncached, is_cancelled)
+
+
+    @retry_on_db_error()
+    def upsert_concerts(self, rows: list[dict]) -> None:
+        saved = {str(row["id"]): row for row in self.backend.upsert(rows)}
+        for row in rows:
+            self.apply_change(row["id"], saved.get(str(row["id"]), row))
+
+
+    @retry_on_db_error()
+    def update_cancelled(self, concert_ids: list[str], is_cancelled: bool) -> None:
+        for row in self.backend.update_cancelled(concert_ids, is_cancelled):
+            self.apply_change(row["id"], row)
+
+
+    @retry_on_db_error()
+    def remove_concerts(self, concert_ids: list[str]) -> None:
+        self.backend.delete(concert_ids)
+        for concert_id in concert_ids:
+            self.apply_change(concert_id, None)
+
+
+    def get_full_concerts(self, concert_ids: list[str]) -> list[Concert]:
+        """Return the complete records of concerts loaded with a column projection,
+        in the order given. They come from the local cache or the detail cache when
+        possible, the rest are fetched in a single request."""
+        rows = {}
+        with self.lock:
+            for concert_id in concert_ids:
+                row = self.cache.get(concert_id) if self.cache is not None else self.details.get(str(concert_id))
+                if row is not None:
+                    rows[str(concert_id)] = row
+                    if self.cache is None:
+                        self.details.move_to_end(str(concert_id))
+        
+        missing = [concert_id for concert_id in concert_ids if str(concert_id) not in rows]
+        if missing:
+            for row in self.fetch_rows(missing):
+                rows[str(row["id"])] = row
+                self.remember(row["id"], row)
+        return [Concert.from_row(rows[str(concert_id)]) for concert_id in concert_ids if str(concert_id) in rows]
+
+
+    def remember(self, concert_id: str, row: dict | None) -> None:
+        if self.cache is not None:
+            return
+        with self.lock:
+            if row is None:
+                self.details.pop(str(concert_id), None)
+                return
+            self.details[str(concert_id)] = row
+            self.details.move_to_end(str(concert_id))
+            while len(self.details) > self.max_details:
+                self.details.popitem(last=False)
+
+
+    @retry_on_db_error()
+    def fetch_rows(self, concert_ids: list[str]) -> list[dict]:
+        return self.backend.select_rows(concert_ids)
+
+
+    @retry_on_db_error()
+    def fetch_concert(self, concert_id: str) -> dict | None:
+        """Fetch a single concert's row from the database."""
+        rows = self.backend.select_rows([concert_id])
+        return rows[0] if rows else None
+
+
+    def record(self, changes: list[tuple[str, str, dict | None]]) -> None:
+        """Journal (op, concert_id, new row) changes and apply them locally, without touching the network."""
+        with self.lock:
+            entries = []
+            for op, concert_id, new in changes:
+                old = self.cache.get(concert_id)
+                base = old.get("updated_at") if old else None
+                if new is not None:
+                    # Edits of an edit are still judged against the server version the first one started from
+                    new = dict(new, updated_at=base)
+                entries.append((op, concert_id, new, base))
+            
+            self.journal.append(entries)
+            for op, concert_id, new, base in entries:
+                self.apply_change(concert_id, new)
+        self.wake_replay()
+
+
+    @retry_on_db_error(retries=1)
+    def flush_journal(self, batch_size: int = 50) -> tuple[int, list[dict]]:
+        """
+        Upload the journaled changes of up to batch_size concerts, in one upsert
+        and one delete. A change to a row someone else modified after the change
+        was made is not uploaded but set aside as a conflict, see resolve_conflict.
+        Returns the number of concerts uploaded and the new conflicts.
+        JournalReplayer does the retrying, so failures aren't retried here.
+        """
+        entries = self.journal.pending(batch_size)
+        if not entries:
+            return 0, []
+        
+        changes = {}
+        for entry in entries:
+            changes.setdefault(entry["concert_id"], []).append(entry)
+        
+        server = {str(row["id"]): row for row in self.backend.select_rows(list(changes))}
+
+        upserts = {}
+        deletes = []
+        conflicts = []
+        for concert_id, concert_entries in changes.items():
+            seqs = [entry["seq"] for entry in concert_entries]
+            latest = concert_entries[-1]
+            current = server.get(concert_id)
+
+            # Also covers uploads that went through but whose response was lost
+            if latest["op"] == "delete" and current is None or latest["op"] == "upsert" and self.matches(current, latest["data"]):
+                self.settle(seqs, concert_id, current)
+            elif not latest["force"] and (current["updated_at"] if current else None) != latest["base"]:
+                self.journal.mark_conflict(seqs)
+                conflicts.append(dict(latest, server=current))
+            elif latest["op"] == "delete":
+                deletes.append((concert_id, seqs))
+            else:
+                upserts[concert_id] = (latest["data"], seqs)
+        
+        if upserts:
+            rows = [{key: value for key, value in data.items() if key != "updated_at"} for data, _ in upserts.values()]
+            try:
+                uploaded = self.backend.upsert(rows)
+            except APIError as e:
+                if is_transient(e):
+                    raise
+                # One bad row fails the whole batch, upload the rows one by one to find it
+                uploaded = []
+                for concert_id, row in zip(upserts, rows):
+                    try:
+                        uploaded += self.backend.upsert([row])
+                    except APIError as e:
+                        if is_transient(e):
+                            raise
+                        data, seqs = upserts[concert_id]
+                        self.journal.mark_conflict(seqs, e.message)
+                        conflicts.append({"concert_id": concert_id, "op": "upsert", "data": data, "server": server.get(concert_id), "error": e.message})
+
+            for row in uploaded:
+                self.settle(upserts[str(row["id"])][1], str(row["id"]), row)
+        
+        if deletes:
+            self.backend.delete([concert_id for concert_id, _ in deletes])
+            for concert_id, seqs in deletes:
+                self.settle(seqs, concert_id, None)
+        
+        return len(changes) - len(conflicts), conflicts
+
+
+    def matches(self, current: dict | None, data: dict) -> bool:
+        return current is not None and all(current.get(key) == value for key, value in data.items() if key != "updated_at")
+
+
+    def settle(self, seqs: list[int], concert_id: str, row: dict | None) -> None:
+        """Drop uploaded entries and take the server's version of the row."""
+        with self.lock:
+            self.journal.remove(seqs)
+            if not self.journal.has_pending(concert_id):
+                self.apply_change(concert_id, row)
+                return
+            
+            # Changed again while uploading, keep the local row but build on the version just uploaded
+            stamp = row["updated_at"] if row else None
+            self.journal.rebase(concert_id, stamp)
+            cached = self.cache.get(concert_id)
+            if cached is not None:
+                self.cache.merge([dict(cached, updated_at=stamp)])
+
+
+    def resolve_conflict(self, concert_id: str, keep_mine: bool) -> None:
+        """Settle a conflict by uploading the local change over the server's version,
+        or by dropping it and restoring the server's version locally."""
+        if keep_mine:
+            self.journal.requeue(concert_id)
+            self.wake_replay()
+            return
+        
+        row = self.fetch_concert(concert_id)
+        with self.lock:
+            self.journal.discard(concert_id)
+            self.apply_change(concert_id, row)
+
+
+    def apply_change(self, concert_id: str, new: dict | None) -> None:
+        """Bring the local cache and stats in line with a row we just changed on the server.
+        The sync watermark is left alone so other clients' changes are still pulled."""
+        if self.cache is None:
+            # Without the old row there is nothing to take a delta from
+            self.stats.invalidate()
+            self.remember(concert_id, new)
+            self.notify(Concert(concert_id) if new is None else None, to_concert(new))
+            return
+        
+        with self.lock:
+            old = self.cache.get(concert_id)
+            if new is not None:
+                self.cache.merge([new])
+            else:
+                self.cache.merge([], [concert_id])
+            old, new = to_concert(old), to_concert(new)
+            self.stats.apply(old, new)
+            self.notify(old, new)
+
+
+    def apply_remote_change(self, concert_id: str, new: dict | None) -> None:
+        """Apply a change pushed by the realtime feed. Echoes of our own writes,
+        already applied when they were made, are dropped."""
+        with self.lock:
+            if self.cache is not None and self.cache.get(concert_id) == new:
+                return
+            if self.journal is not None and str(concert_id) in self.journal.held_ids():
+                # Our own change wins locally until it's uploaded, a real conflict is caught then
+                return
+            self.apply_change(concert_id, new)
\ No newline at end of file
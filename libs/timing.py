@@ -0,0 +1,139 @@
+import csv
+import json
+import time
+import threading
+from bisect import bisect_left
+from functools import wraps
+
+from libs.retry import metrics as retry_metrics
+
+
+# Upper bounds of the latency histogram buckets in milliseconds, the last bucket takes the rest
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+CSV_FIELDS = ("name", "calls", "errors", "mean_ms", "p50_ms", "p95_ms", "max_ms", "total_ms", "rows", "retries")
+
+
+class Timings:
+    """Latency histograms, payload row counts and error counts per instrumented
+    function. Recording a call is a clock read, a bisect and a few additions
+    under a lock, so it stays on in production. The Ctrl+Shift+D diagnostics
+    window (pages/diagnostics.py) shows them."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.enabled = True
+        self.functions = {}
+
+
+    def record(self, name: str, elapsed_ms: float, rows: int | None = None, error: bool = False) -> None:
+        with self.lock:
+            stats = self.functions.get(name)
+            if stats is None:
+                stats = self.functions[name] = {
+                    "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "histogram": [0] * (len(BUCKETS_MS) + 1),
+                }
+            stats["calls"] += 1
+            stats["errors"] += error
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            if rows is not None:
+                stats["rows"] += rows
+            stats["histogram"][bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+
+    def reset(self) -> None:
+        with self.lock:
+            self.functions.clear()
+
+
+    def snapshot(self) -> list[dict]:
+        """One summary per function, slowest in total first. Percentiles are
+        the upper bound of the histogram bucket they fall in."""
+        with self.lock:
+            functions = {name: dict(stats, histogram=list(stats["histogram"])) for name, stats in self.functions.items()}
+        retries = retry_metrics.snapshot()
+
+        summaries = []
+        for name, stats in functions.items():
+            summaries.append({
+                "name": name,
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "mean_ms": round(stats["total_ms"] / stats["calls"], 3),
+                "p50_ms": percentile(stats["histogram"], 0.5, stats["max_ms"]),
+                "p95_ms": percentile(stats["histogram"], 0.95, stats["max_ms"]),
+                "max_ms": round(stats["max_ms"], 3),
+                "total_ms": round(stats["total_ms"], 3),
+                "rows": stats["rows"],
+                "retries": retries.get(name, {}).get("retries", 0),
+                "histogram": dict(zip([f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], stats["histogram"])),
+            })
+        summaries.sort(key=lambda summary: summary["total_ms"], reverse=True)
+        return summaries
+
+
+    def export_json(self, path: str) -> None:
+        with open(path, "w") as export_file:
+            json.dump({"functions": self.snapshot(), "retries": retry_metrics.snapshot()}, export_file, indent=2)
+
+
+    def export_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as export_file:
+            writer = csv.DictWriter(export_file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(self.snapshot())
+
+
+def percentile(histogram: list[int], fraction: float, max_ms: float) -> float:
+    rank = fraction * sum(histogram)
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if count and seen >= rank:
+            return BUCKETS_MS[index] if index < len(BUCKETS_MS) else round(max_ms, 3)
+    return 0
+
+
+timings = Timings()
+
+
+def timed(name: str | None = None):
+    """
+    Decorator to record the latency of every call in timings, under name or the
+    function's qualified name. Calls returning a list also record its length,
+    other calls the length of their first list argument, as the payload size.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not timings.enabled:
+                return func(*args, **kwargs)
+
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                timings.record(label, (time.perf_counter() - started) * 1000, error=True)
+                raise
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if isinstance(result, list):
+                rows = len(result)
+            else:
+                rows = next((len(arg) for arg in args if isinstance(arg, list)), None)
+            timings.record(label, elapsed_ms, rows)
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument(cls):
+    """Class decorator applying timed to every method the class defines."""
+    for attribute, value in list(vars(cls).items()):
+        if callable(value) and not attribute.startswith("__"):
+            setattr(cls, attribute, timed()(value))
+    return cls
@@ -0,0 +1,64 @@
+import queue
+import tkinter as tk
+from tkinter import messagebox
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BackgroundRunner:
+    """Runs blocking calls (database, network) on a thread pool and hands
+    their results back to the Tk thread, so the mainloop never blocks."""
+
+    def __init__(self, root: tk.Misc, max_workers: int = 4, poll_interval: int = 50, max_calls: int = 200):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self.calls = queue.SimpleQueue()
+        self.poll_interval = poll_interval
+        # Callbacks run per tick, a burst of them mustn't keep the window from redrawing
+        self.max_calls = max_calls
+        self.root.after(self.poll_interval, self.poll)
+
+
+    def submit(self, func, *args, on_success=None, on_error=None, **kwargs) -> Future:
+        """Run func(*args, **kwargs) in the background.
+        on_success(result) or on_error(exception) is then called on the Tk thread."""
+        def done(future: Future):
+            error = future.exception()
+            if error is not None:
+                self.post(on_error or self.show_error, error)
+            elif on_success is not None:
+                self.post(on_success, future.result())
+
+        future = self.executor.submit(func, *args, **kwargs)
+        future.add_done_callback(done)
+        return future
+
+
+    def post(self, callback, *args) -> None:
+        """Schedule callback(*args) on the Tk thread. Safe to call from any thread."""
+        self.calls.put((callback, args))
+
+
+    def poll(self):
+        # Tk isn't thread safe, so worker threads queue callbacks and the mainloop drains them
+        for _ in range(self.max_calls):
+            try:
+                callback, args = self.calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                self.show_error(e)
+        else:
+            # More waiting, carry on as soon as Tk has handled its own events
+            self.root.after(1, self.poll)
+            return
+        self.root.after(self.poll_interval, self.poll)
+
+
+    def show_error(self, error: Exception):
+        messagebox.showerror("Error", f"Something went wrong while talking to the database:\n{error}")
+
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,28 +1,89 @@
 import tkinter as tk
 import ttkbootstrap as ttk
 from tkinter import messagebox
-from datetime import datetime
+from bisect import bisect_left
+from datetime import date
 
-from libs.supabase_client import Supabase
-from libs.utils import generate_contract_pdf, format_indian_number
+from libs.supabase_client import Supabase, LIST_COLUMNS
+from libs.worker import BackgroundRunner
+from libs.jobs import ContractQueue
+from libs.formatting import format_indian_number, format_indian_numbers
+from libs.search import SearchIndex, SEARCH_FIELDS
+from libs.models import Concert
+from libs.timing import timed
+
+PAGE_SIZE = 100
 
 class ConcertsPage(ttk.Frame):
-    def __init__(self, parent: ttk.Frame, supabase: Supabase, show_page_callback):
+    def __init__(self, parent: ttk.Frame, supabase: Supabase, runner: BackgroundRunner, contracts: ContractQueue, show_page_callback):
         super().__init__(parent)
         self.show_page_callback = show_page_callback
         self.supabase = supabase
+        self.runner = runner
+        self.contracts = contracts
         self.concerts = {}
+        self.load_id = 0
+        self.last_key = None
+        self.has_more = False
+        self.loading_more = False
+        # Without a local cache rows are loaded without their note (LIST_COLUMNS), the
+        # cache always returns full rows so notes are searchable there
+        if self.supabase.cache is None:
+            self.search = SearchIndex(tuple(field for field in SEARCH_FIELDS if field in LIST_COLUMNS))
+        else:
+            self.search = SearchIndex()
+        self.sort_keys = {}
+        self.date_order = None  # every loaded ID newest first, kept until a row changes
+        self.sort_column = None
+        self.sort_desc = False
+        # True while the search or a column sort decides which rows show and in what order
+        self.arranged = False
+        # True while the sync after the first page runs, its notifications are replaced by a reload
+        self.bulk_syncing = False
 
         ttk.Label(self, text="Tanmay Kar and Friends Concerts", font=("Arial Black", 24)).pack(pady=10)
 
+        self.status_label = ttk.Label(self, text="", font=("Arial", 10))
+        self.status_label.pack()
+
+        # Search box, filters the rows on every keystroke without going to the database
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill="x", padx=20, pady=(10, 0))
+        ttk.Label(search_frame, text="Search", font=("Arial", 10)).pack(side="left", padx=(0, 10))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self.arrange_rows())
+        ttk.Entry(search_frame, textvariable=self.search_var, width=40).pack(side="left")
+        self.match_label = ttk.Label(search_frame, text="", font=("Arial", 10))
+        self.match_label.pack(side="left", padx=10)
+
         # Treeview setup
         columns = ("organizer", "venue", "district", "date", "time", "total", "advance", "note")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=15)
+        self.columns = columns
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill="both", expand=True, padx=20, pady=(10, 5))
+
+        # Ctrl/Shift-click selects several concerts for the bulk actions
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15, selectmode="extended")
         for col in columns:
-            self.tree.heading(col, text=col.capitalize())
+            self.tree.heading(col, text=col.capitalize(), command=lambda col=col: self.sort_by(col))
             self.tree.column(col, anchor="center", width=100)
 
-        self.tree.pack(fill="both", expand=True, padx=20, pady=(10, 5))
+        self.tree.column("organizer", width=220, stretch=True)
+        self.tree.column("venue", width=220, stretch=True)
+        self.tree.column("district", width=100, stretch=True)
+        self.tree.column("date", width=70, stretch=True)
+        self.tree.column("time", width=70, stretch=True)
+        self.tree.column("total", width=70, stretch=True)
+        self.tree.column("advance", width=70, stretch=True)
+        self.tree.column("note", width=120, stretch=True)
+
+        # Rows are loaded a page at a time as the user scrolls towards the end, and stay
+        # in the tree once loaded. Searching or sorting loads every remaining page
+        # (load_remaining_concerts), so from then on the tree holds the whole table
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
 
         self.tree.tag_configure("cancelled", background="#5f1f25")  # light red for cancelled
         self.tree.tag_configure("today", background="#1e3b2c")  # light green for today
@@ -50,57 +111,379 @@ class ConcertsPage(ttk.Frame):
         # Add concert button
         ttk.Button(self, text="Add New Concert", width=20, command=lambda: self.show_page("home")).pack(pady=(0, 20), ipady=5)
 
+        # Rows changed anywhere in the data layer are patched into the tree as they happen
+        self.supabase.add_listener(lambda old, new: self.runner.post(self.on_concert_changed, old, new))
+
         self.load_concerts()
 
+    @timed()
     def load_concerts(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        if self.concerts:
+            self.refresh_concerts()
+            return
+        
+        # Results from an older load are dropped if the page is reloaded in the meantime
+        self.load_id += 1
+        load_id = self.load_id
+        self.set_busy("Loading concerts...")
+        self.runner.submit(
+            self.supabase.get_concerts_page, None, PAGE_SIZE, LIST_COLUMNS,
+            on_success=lambda concerts: self.on_first_page(load_id, concerts),
+            on_error=self.on_task_error
+        )
+
+
+    def on_first_page(self, load_id, concerts):
+        if load_id != self.load_id:
+            return
+        
+        self.reset_concerts()
+        self.insert_concerts(concerts)
+
+        # The first page came from the local cache if there is one. The sync may
+        # bring in anything up to the whole table (first launch), so instead of
+        # patching in a row per notification the first page is reloaded after it
+        def fetch():
+            self.supabase.sync_concerts()
+            return self.supabase.get_concerts_page(None, PAGE_SIZE, LIST_COLUMNS)
+
+        def on_synced(concerts):
+            self.bulk_syncing = False
+            if load_id != self.load_id:
+                return
+            self.set_busy(None)
+            self.diff_concerts(concerts)
+            self.has_more = len(concerts) == PAGE_SIZE
+            self.last_key = (concerts[-1].date, concerts[-1].id) if concerts else None
+
+        def on_error(error):
+            self.bulk_syncing = False
+            self.on_task_error(error)
+
+        # Notifications are posted before on_synced, so all of the sync's are dropped, as are
+        # those of saves made meanwhile, which the reloaded page includes all the same
+        self.bulk_syncing = True
+        self.runner.submit(fetch, on_success=on_synced, on_error=on_error)
+
+
+    def refresh_concerts(self):
+        """Bring the rows already in the tree up to date, touching only those that changed."""
+        self.load_id += 1
+        load_id = self.load_id
+        window = max(len(self.concerts), PAGE_SIZE)
+
+        def fetch():
+            self.supabase.sync_concerts()
+            return self.supabase.get_concerts_page(None, window, LIST_COLUMNS)
+        
+        def on_refreshed(concerts):
+            if load_id != self.load_id:
+                return
+            self.set_busy(None)
+            self.diff_concerts(concerts)
+            self.has_more = len(concerts) == window
+            self.last_key = (concerts[-1].date, concerts[-1].id) if concerts else None
+
+        self.set_busy("Refreshing concerts...")
+        self.runner.submit(fetch, on_success=on_refreshed, on_error=self.on_task_error)
+
+
+    def diff_concerts(self, concerts: list[Concert]):
+        """Sync the tree with an ordered list of concerts by inserting, updating
+        and deleting only the rows that differ. Selection and scroll position are kept."""
+        scroll = self.tree.yview()[0]
+        new_ids = [concert.id for concert in concerts]
+        wanted = set(new_ids)
+
+        removed = [iid for iid in self.concerts if iid not in wanted]
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                self.untrack(iid)
+        
+        today = date.today()
+        for index, (iid, concert) in enumerate(zip(new_ids, concerts)):
+            old = self.concerts.get(iid)
+            if old is None:
+                self.tree.insert("", index, iid=iid, values=self.row_values(concert), tags=self.row_tags(concert, today))
+            elif old != concert:
+                self.tree.item(iid, values=self.row_values(concert), tags=self.row_tags(concert, today))
+            else:
+                continue
+            self.track(iid, concert)
+        
+        # Only reorder if a changed date moved rows around
+        children = self.tree.get_children()
+        if self.arranged:
+            self.arrange_rows()
+        elif list(children) != new_ids:
+            for index, iid in enumerate(new_ids):
+                if children[index] != iid:
+                    self.tree.move(iid, "", index)
+                    children = self.tree.get_children()
+        
+        self.tree.yview_moveto(scroll)
+
+
+    def on_concert_changed(self, old: Concert | None, new: Concert | None):
+        """Patch a single row changed by a save, cancel, restore, delete or sync."""
+        if self.bulk_syncing:
+            return
+        
+        iid = (new or old).id
+        selected = iid in self.tree.selection()
+
+        existing = self.concerts.get(iid)
+        if existing is not None:
+            if new is not None and new.date == existing.date:
+                # Same position, just update the row in place
+                self.tree.item(iid, values=self.row_values(new), tags=self.row_tags(new))
+                self.track(iid, new)
+                if self.arranged:
+                    self.arrange_rows()
+                self.on_concert_selected()
+                return
+            
+            self.tree.delete(iid)
+            self.untrack(iid)
+        
+        if new is None or not self.in_window(new):
+            return
+        
+        self.tree.insert("", self.row_index(new), iid=iid, values=self.row_values(new), tags=self.row_tags(new))
+        self.track(iid, new)
+        if self.arranged:
+            self.arrange_rows()
+        if selected and self.tree.exists(iid):
+            self.tree.selection_add(iid)
+
+
+    def in_window(self, concert: Concert) -> bool:
+        # Rows older than the last loaded page appear once the user scrolls to them
+        if not self.has_more or self.last_key is None:
+            return True
+        return (concert.date, concert.id) >= (self.last_key[0], str(self.last_key[1]))
+
+
+    def row_index(self, concert: Concert) -> int | str:
+        # The rows are newest first, so find the first one older than the concert
+        key = (concert.date, concert.id)
+        children = self.tree.get_children()
+        index = bisect_left(range(len(children)), True, key=lambda i: (self.concerts[children[i]].date, children[i]) < key)
+        return index if index < len(children) else "end"
+
+
+    def track(self, iid: str, concert: Concert, index: bool = True):
+        """Record a row that was just inserted into or updated in the tree."""
+        self.concerts[iid] = concert
+        self.sort_keys[iid] = self.row_keys(concert)
+        self.date_order = None
+        if index:
+            self.search.add(iid, concert)
+
+
+    def untrack(self, iid: str):
+        del self.concerts[iid]
+        del self.sort_keys[iid]
+        self.date_order = None
+        self.search.remove(iid)
+
+
+    def on_task_error(self, error):
+        self.set_busy(None)
+        self.runner.show_error(error)
+
+
+    def reset_concerts(self):
+        # Rows hidden by the search are detached, so delete by ID rather than by the visible children
+        self.tree.delete(*self.concerts)
         self.concerts.clear()
+        self.sort_keys.clear()
+        self.search.clear()
+        self.date_order = None
+        self.last_key = None
+        self.has_more = True
+
 
-        concerts = self.supabase.get_concerts()
-
-        for concert in concerts:
-            display_organizer = f"🔊 {concert['organizer']}" if concert["is_sound_included"] else concert["organizer"]
-            values = (
-                display_organizer,
-                concert["venue"] or "-",
-                concert["district"] or "-",
-                datetime.strptime(concert["date"], "%Y-%m-%d").strftime("%d %b, %Y") or "-",
-                datetime.strptime(concert["time"], "%H:%M:%S").strftime("%I:%M %p") or "-",
-                format_indian_number(concert["total"]) or "-",
-                format_indian_number(concert["advance"]) or "-",
-                concert["contact"] or "-",
-                concert["note"] or "-"
-            )
-            tags = ("cancelled",) if concert["is_cancelled"] else ()
-            tags += ("today",) if concert["date"] == datetime.now().strftime("%Y-%m-%d") else ()
-
-            iid = str(concert["id"])
-            self.tree.insert("", "end", iid=iid, values=values, tags=tags)
-            self.concerts[iid] = concert
+    @timed()
+    def load_more_concerts(self):
+        load_id = self.load_id
+
+        def on_page(concerts):
+            self.loading_more = False
+            if load_id == self.load_id:
+                self.insert_concerts(concerts)
+
+        def on_error(error):
+            self.loading_more = False
+            self.runner.show_error(error)
         
-        self.tree.column("organizer", width=220, stretch=True)
-        self.tree.column("venue", width=220, stretch=True)
-        self.tree.column("district", width=100, stretch=True)
-        self.tree.column("date", width=70, stretch=True)
-        self.tree.column("time", width=70, stretch=True)
-        self.tree.column("total", width=70, stretch=True)
-        self.tree.column("advance", width=70, stretch=True)
-        self.tree.column("note", width=120, stretch=True)
+        self.runner.submit(self.supabase.get_concerts_page, self.last_key, PAGE_SIZE, LIST_COLUMNS, on_success=on_page, on_error=on_error)
+
+
+    @timed()
+    def load_remaining_concerts(self):
+        """Load every page not loaded yet, so the search and the sort cover all concerts."""
+        self.loading_more = True
+        load_id = self.load_id
+        after = self.last_key
+
+        def fetch():
+            concerts = []
+            while True:
+                page = self.supabase.get_concerts_page(after if not concerts else (concerts[-1].date, concerts[-1].id), PAGE_SIZE, LIST_COLUMNS)
+                concerts += page
+                if len(page) < PAGE_SIZE:
+                    return concerts
+
+        def on_loaded(concerts):
+            if load_id == self.load_id:
+                self.insert_concerts(concerts)
+                self.has_more = False
+            self.loading_more = False
+            self.arrange_rows()
+
+        def on_error(error):
+            self.loading_more = False
+            self.match_label.config(text="")
+            self.runner.show_error(error)
+
+        self.match_label.config(text="Loading all concerts...")
+        self.runner.submit(fetch, on_success=on_loaded, on_error=on_error)
+
+
+    def sort_by(self, column: str):
+        """Sort on a column, clicking it again flips the direction."""
+        if self.sort_column == column:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_column = column
+            self.sort_desc = False
+        
+        for col in self.columns:
+            arrow = (" ▼" if self.sort_desc else " ▲") if col == column else ""
+            self.tree.heading(col, text=col.capitalize() + arrow)
+        self.arrange_rows()
+
+
+    def arrange_rows(self):
+        """Show only the rows matching the search box, in the order of the sorted column."""
+        matches = self.search.search(self.search_var.get())
+        if matches is None and self.sort_column is None and not self.arranged:
+            return
+
+        if self.date_order is None:
+            self.date_order = sorted(self.concerts, key=lambda iid: (self.concerts[iid].date, iid), reverse=True)
+
+        ids = self.concerts if matches is None else matches
+        # Newest first, the stable sort on the clicked column then keeps that order among ties
+        visible = self.date_order if matches is None else [iid for iid in self.date_order if iid in matches]
+        if self.sort_column is not None:
+            column = self.columns.index(self.sort_column)
+            visible = sorted(visible, key=lambda iid: self.sort_keys[iid][column], reverse=self.sort_desc)
+
+        # One Tk call that moves the existing items, rows left out are detached rather than deleted
+        self.tree.set_children("", *visible)
+        self.arranged = matches is not None or self.sort_column is not None
+
+        hidden = [iid for iid in self.tree.selection() if iid not in ids]
+        if hidden:
+            self.tree.selection_remove(*hidden)
+
+        if self.arranged and self.has_more:
+            # The search and the sort have to see every concert, not just the loaded pages
+            if not self.loading_more:
+                self.load_remaining_concerts()
+        elif matches is not None:
+            self.match_label.config(text=f"{len(visible)} of {len(self.concerts)} concerts")
+        else:
+            self.match_label.config(text="")
+
+
+    def insert_concerts(self, concerts: list[Concert]):
+        self.has_more = len(concerts) == PAGE_SIZE
+        if concerts:
+            self.last_key = (concerts[-1].date, concerts[-1].id)
+
+        today = date.today()
+        # The amount columns are formatted in one go, a page repeats the same few amounts a lot
+        totals = format_indian_numbers([concert.total for concert in concerts])
+        advances = format_indian_numbers([concert.advance for concert in concerts])
+        for concert, total, advance in zip(concerts, totals, advances):
+            iid = concert.id
+            values = self.row_values(concert, (total, advance))
+            if iid in self.concerts:
+                # Already patched in by a change notification
+                self.tree.item(iid, values=values, tags=self.row_tags(concert, today))
+            else:
+                self.tree.insert("", "end", iid=iid, values=values, tags=self.row_tags(concert, today))
+            self.track(iid, concert, index=False)
+        self.search.add_many({concert.id: concert for concert in concerts})
+        
+        if self.arranged:
+            self.arrange_rows()
+    
+
+    def row_values(self, concert: Concert, amounts: tuple[str, str] | None = None) -> tuple:
+        """amounts are the total and advance already formatted, if the caller formatted a whole page of them."""
+        display_organizer = f"🔊 {concert.organizer}" if concert.is_sound_included else concert.organizer
+        total, advance = amounts or (format_indian_number(concert.total), format_indian_number(concert.advance))
+        return (
+            display_organizer,
+            concert.venue or "-",
+            concert.district or "-",
+            concert.date.strftime("%d %b, %Y"),
+            concert.time.strftime("%I:%M %p"),
+            total or "-",
+            advance or "-",
+            concert.contact or "-",
+            concert.note or "-"
+        )
+    
+
+    def row_keys(self, concert: Concert) -> tuple:
+        """Typed sort keys lined up with row_values, worked out once per row
+        so sorting never has to parse the formatted dates and amounts."""
+        return (
+            concert.organizer.casefold(),
+            (concert.venue or "").casefold(),
+            (concert.district or "").casefold(),
+            concert.date,
+            concert.time,
+            concert.total or 0,
+            concert.advance or 0,
+            (concert.contact or "").casefold(),
+        )
+
+
+    def row_tags(self, concert: Concert, today: date | None = None) -> tuple:
+        today = today or date.today()
+        tags = ("cancelled",) if concert.is_cancelled else ()
+        tags += ("today",) if concert.date == today else ()
+        return tags
+    
+
+    def on_tree_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.has_more and not self.loading_more and float(last) > 0.9:
+            self.loading_more = True
+            self.load_more_concerts()
     
 
     def on_concert_selected(self, event=None):
-        selected = self.tree.selection()
-        if selected:
-            concert_id = selected[0]
-            concert = self.concerts.get(concert_id, {})
+        concerts = [self.concerts[iid] for iid in self.tree.selection() if iid in self.concerts]
+        if concerts:
+            count = len(concerts)
+            suffix = "Concert" if count == 1 else f"{count} Concerts"
 
-            if concert["is_cancelled"]:
-                self.cancel_btn.config(text="Restore Concert")
+            # A mixed selection cancels the ones still on, restoring only when all are cancelled
+            if all(concert.is_cancelled for concert in concerts):
+                self.cancel_btn.config(text=f"Restore {suffix}")
             else:
-                self.cancel_btn.config(text="Cancel Concert")
+                self.cancel_btn.config(text=f"Cancel {suffix}")
             
-            self.edit_btn.config(state="normal")
+            # Only one concert can be edited at a time
+            self.edit_btn.config(state="normal" if count == 1 else "disabled")
             self.cancel_btn.config(state="normal")
             self.delete_btn.config(state="normal")
             self.mark_paid_btn.config(state="normal")
@@ -114,72 +497,110 @@ class ConcertsPage(ttk.Frame):
 
 
     def get_selected_concert(self):
-        selected = self.tree.selection()
-        if not selected:
+        concerts = self.get_selected_concerts()
+        return concerts[0] if concerts else None
+
+
+    def get_selected_concerts(self) -> list[Concert]:
+        concerts = [self.concerts[iid] for iid in self.tree.selection() if iid in self.concerts]
+        if not concerts:
             messagebox.showwarning("No Selection", "Please select a concert.")
-            return None
-        
-        iid = selected[0]
-        return self.concerts.get(iid)
+        return concerts
+    
+
+    def describe(self, concerts: list[Concert]) -> str:
+        if len(concerts) == 1:
+            return f"the concert by {concerts[0].organizer} on {concerts[0].date}"
+        return f"these {len(concerts)} concerts"
 
 
     def edit_concert(self):
         concert = self.get_selected_concert()
         if concert:
-            self.show_page("home", concert)
+            # The row only has the list columns, the form needs the whole concert
+            def on_fetched(concerts):
+                self.set_busy(None)
+                if concerts:
+                    self.show_page("home", concerts[0])
+                else:
+                    messagebox.showerror("Error", "This concert no longer exists.")
+
+            self.set_busy("Loading concert...")
+            self.runner.submit(self.supabase.get_full_concerts, [concert.id], on_success=on_fetched, on_error=self.on_task_error)
 
 
     def cancel_concert(self):
-        concert = self.get_selected_concert()
-        if not concert:
+        concerts = self.get_selected_concerts()
+        if not concerts:
             return
         
-        if concert["is_cancelled"]:
-            # Restore the concert
-            if messagebox.askyesno(
-                "Restore Confirmation",
-                f"Are you sure you want to restore the concert by {concert['organizer']} on {concert['date']}?"
-            ):
-                self.supabase.restore_concert(concert["id"])
-                self.tree.item(concert["id"], tags=())
-                concert["is_cancelled"] = not concert["is_cancelled"]
-                self.cancel_btn.config(text="Cancel Concert")
+        # The rows themselves are updated through the change notifications
+        if all(concert.is_cancelled for concert in concerts):
+            # Restore the concerts
+            if messagebox.askyesno("Restore Confirmation", f"Are you sure you want to restore {self.describe(concerts)}?"):
+                self.set_busy("Restoring concerts...")
+                self.runner.submit(
+                    self.supabase.restore_concerts, [concert.id for concert in concerts],
+                    on_success=lambda _: self.set_busy(None), on_error=self.on_task_error
+                )
 
         else:
-            # Cancel the concert
-            if messagebox.askyesno(
-                "Cancel Confirmation",
-                f"Are you sure you want to cancel the concert by {concert['organizer']} on {concert['date']}?"
-            ):
-                self.supabase.cancel_concert(concert["id"])
-                self.tree.item(concert["id"], tags=("cancelled",))
-                concert["is_cancelled"] = not concert["is_cancelled"]
-                self.cancel_btn.config(text="Restore Concert")
+            # Cancel the concerts that aren't cancelled yet
+            concerts = [concert for concert in concerts if not concert.is_cancelled]
+            if messagebox.askyesno("Cancel Confirmation", f"Are you sure you want to cancel {self.describe(concerts)}?"):
+                self.set_busy("Cancelling concerts...")
+                self.runner.submit(
+                    self.supabase.cancel_concerts, [concert.id for concert in concerts],
+                    on_success=lambda _: self.set_busy(None), on_error=self.on_task_error
+                )
     
 
     def delete_concert(self):
-        concert = self.get_selected_concert()
-        if concert and messagebox.askyesno("Delete Confirmation", F"Are you sure you want to DELETE the concert by {concert['organizer']} on {concert['date']}?"):
-            self.supabase.delete_concert(concert["id"])
-            self.load_concerts()
-            messagebox.showinfo("Success", "Concert deleted!")
+        concerts = self.get_selected_concerts()
+        if concerts and messagebox.askyesno("Delete Confirmation", f"Are you sure you want to DELETE {self.describe(concerts)}?"):
+            def on_deleted(_):
+                self.set_busy(None)
+                messagebox.showinfo("Success", "Concert deleted!" if len(concerts) == 1 else f"{len(concerts)} concerts deleted!")
+
+            self.set_busy("Deleting concerts...")
+            self.runner.submit(self.supabase.delete_concerts, [concert.id for concert in concerts], on_success=on_deleted, on_error=self.on_task_error)
     
 
     def generate_pdf(self):
-        concert = self.get_selected_concert()
-        if concert:
-            file_path = generate_contract_pdf(concert)
-            messagebox.showinfo("Success", f"Contract PDF generated and saved in {file_path}")
+        # Rendered in the background, the status bar reports each one
+        for concert in self.get_selected_concerts():
+            self.contracts.enqueue(concert)
     
 
     def mark_paid_concert(self):
-        concert = self.get_selected_concert()
-        if concert and messagebox.askyesno("Mark Full Paid", "Are you sure you want to mark the concert as full paid?"):
-            generate_contract_pdf(concert, paid_in_full=True)
-            concert["advance"] = concert["total"]
-            self.supabase.save_concert(concert)
-            self.load_concerts()
-            messagebox.showinfo("Success", "Concert marked as paid!")
+        concerts = self.get_selected_concerts()
+        if concerts and messagebox.askyesno("Mark Full Paid", f"Are you sure you want to mark {self.describe(concerts)} as full paid?"):
+            def save():
+                # Save the whole concerts, the rows lack the note. These are
+                # copies, so the rows only change once the save has gone through
+                paid = [concert.replace(advance=concert.total) for concert in self.supabase.get_full_concerts([concert.id for concert in concerts])]
+                self.supabase.save_concerts(paid)
+                return paid
+
+            def on_saved(paid):
+                self.set_busy(None)
+                for concert in paid:
+                    self.contracts.enqueue(concert, paid_in_full=True)
+                messagebox.showinfo("Success", "Concert marked as paid!" if len(paid) == 1 else f"{len(paid)} concerts marked as paid!")
+
+            self.set_busy("Saving concerts...")
+            self.runner.submit(save, on_success=on_saved, on_error=self.on_task_error)
+
+
+    def set_busy(self, message: str | None):
+        """Show a pending message and block the row actions while a background call runs."""
+        self.status_label.config(text=message or "")
+        self.configure(cursor="watch" if message else "")
+        if message:
+            for button in [self.edit_btn, self.cancel_btn, self.delete_btn, self.mark_paid_btn, self.generate_pdf_btn]:
+                button.config(state="disabled")
+        else:
+            self.on_concert_selected()
             
 
     def show_page(self, page_name, data=None):
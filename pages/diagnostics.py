@@ -0,0 +1,71 @@
+import ttkbootstrap as ttk
+from tkinter import filedialog, messagebox
+
+from libs.timing import Timings, CSV_FIELDS
+from libs.retry import breaker
+
+
+class DiagnosticsWindow(ttk.Toplevel):
+    """Timings of the data calls, page loads and PDF rendering (libs/timing.py).
+    Not part of the normal navigation, App opens it on Ctrl+Shift+D."""
+
+    def __init__(self, parent, timings: Timings):
+        super().__init__(parent)
+        self.timings = timings
+        self.title("Diagnostics")
+        self.geometry("1000x500")
+
+        self.breaker_label = ttk.Label(self, text="", font=("Arial", 10))
+        self.breaker_label.pack(anchor="w", padx=10, pady=(10, 0))
+
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tree = ttk.Treeview(tree_frame, columns=CSV_FIELDS, show="headings")
+        for col in CSV_FIELDS:
+            self.tree.heading(col, text=col.replace("_", " ").title())
+            self.tree.column(col, width=300 if col == "name" else 70, anchor="w" if col == "name" else "e")
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x", padx=10, pady=(0, 10))
+        ttk.Button(button_frame, text="Refresh", command=self.refresh).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Reset", command=self.reset).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Export CSV", command=lambda: self.export("csv")).pack(side="right", padx=5)
+        ttk.Button(button_frame, text="Export JSON", command=lambda: self.export("json")).pack(side="right", padx=5)
+
+        self.refresh()
+
+
+    def refresh(self):
+        state = breaker.snapshot()
+        self.breaker_label.config(text=f"Circuit breaker {state['state']}, opened {state['times_opened']} time(s)")
+        self.tree.delete(*self.tree.get_children())
+        for summary in self.timings.snapshot():
+            self.tree.insert("", "end", values=[summary[field] for field in CSV_FIELDS])
+
+
+    def reset(self):
+        self.timings.reset()
+        self.refresh()
+
+
+    def export(self, kind: str):
+        file_path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=f".{kind}", initialfile=f"timings.{kind}",
+            filetypes=[(kind.upper(), f"*.{kind}")]
+        )
+        if not file_path:
+            return
+
+        try:
+            if kind == "json":
+                self.timings.export_json(file_path)
+            else:
+                self.timings.export_csv(file_path)
+        except OSError as e:
+            messagebox.showerror("Export Failed", str(e), parent=self)
+            return
+        messagebox.showinfo("Exported", f"Timings saved in {file_path}", parent=self)
@@ -1,18 +1,29 @@
 import uuid
 import ttkbootstrap as ttk
 from tkinter import messagebox, Event
-from PIL import Image, ImageTk
-from datetime import datetime
+from datetime import datetime, date, time
+from calendar import month_name
 
 from libs.supabase_client import Supabase
+from libs.worker import BackgroundRunner
+from libs.jobs import ContractQueue
+from libs.stats import StatsStore
 from libs.data import Districts
-from libs.utils import generate_contract_pdf, format_indian_number, lighten_color
+from libs.utils import lighten_color, set_if_changed
+from libs.formatting import format_indian_number
+from libs.assets import assets
+from libs.models import Concert
+from libs.timing import timed
 
 class HomePage(ttk.Frame):
-    def __init__(self, parent: ttk.Frame, supabase: Supabase, show_page_callback):
+    def __init__(self, parent: ttk.Frame, supabase: Supabase, runner: BackgroundRunner, contracts: ContractQueue,
+                 stats_store: StatsStore, show_page_callback):
         super().__init__(parent)
         self.show_page_callback = show_page_callback
         self.supabase = supabase
+        self.runner = runner
+        self.contracts = contracts
+        self.stats_store = stats_store
 
         self.style = ttk.Style()
         self.style.configure("Custom.TEntry", padding=6)
@@ -95,8 +106,8 @@ class HomePage(ttk.Frame):
         clear_btn = ttk.Button(button_frame, text="Clear", command=self.clear_form)
         clear_btn.pack(side="left", padx=5, ipady=5)
 
-        save_btn = ttk.Button(button_frame, text="Save Concert", width=16, style="success", command=self.save_concert)
-        save_btn.pack(side="left", padx=5, ipady=5)
+        self.save_btn = ttk.Button(button_frame, text="Save Concert", width=16, style="success", command=self.save_concert)
+        self.save_btn.pack(side="left", padx=5, ipady=5)
 
         self.form.grid_columnconfigure(0, weight=0)  # Labels - don't stretch
         self.form.grid_columnconfigure(1, weight=1)  # Entries - stretch
@@ -123,24 +134,23 @@ class HomePage(ttk.Frame):
         self.monthly_stats.grid(row=0, rowspan=2, column=1, sticky="news", padx=(30, 20))
 
         self.style.configure("Card.TLabel", background=self.card_bg)
+        self.build_stats()
+        self.stats_store.subscribe(self.show_stats)
         self.load_stats()
 
 
-    def load_stats(self):
-        for stats in [self.yearly_stats, self.district_stats, self.monthly_stats]:
-            for widget in stats.winfo_children():
-                widget.destroy()
-        
-        year_stats, district_stats, month_stats = self.supabase.get_stats()
-
+    def build_stats(self):
+        """Create the stats cards once, refreshes only update their text variables."""
         # Create yearly stats
         ttk.Label(self.yearly_stats, text=f"Yearly Stats", font=("Arial Black", 12), style="Card.TLabel", anchor="center") \
             .grid(row=0, column=0, columnspan=2, sticky="ew", padx=2, pady=15)
         
-        ttk.Label(self.yearly_stats, text=f"Last Year: {year_stats['previous']}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
+        self.last_year_var = ttk.StringVar(value="Last Year: -")
+        ttk.Label(self.yearly_stats, textvariable=self.last_year_var, font=("Arial", 12), style="Card.TLabel", anchor="center") \
             .grid(row=1, column=0, sticky="ew", padx=2, pady=(10, 20))
         
-        ttk.Label(self.yearly_stats, text=f"This Year: {year_stats['current']}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
+        self.this_year_var = ttk.StringVar(value="This Year: -")
+        ttk.Label(self.yearly_stats, textvariable=self.this_year_var, font=("Arial", 12), style="Card.TLabel", anchor="center") \
             .grid(row=1, column=1, sticky="ew", padx=2, pady=(10, 20))
         
         self.yearly_stats.grid_columnconfigure(0, weight=1)
@@ -149,22 +159,20 @@ class HomePage(ttk.Frame):
         self.yearly_stats.grid_rowconfigure(1, weight=1)
         
         # Create district stats
-        highest_district = max(district_stats.items(), key=lambda x: x[1])
-        lowest_district = min({district: count for district, count in district_stats.items() if count > 0}.items(),
-                              key=lambda x: x[1])
-        
         ttk.Label(self.district_stats, text=f"District Stats", font=("Arial Black", 12), style="Card.TLabel", anchor="center") \
             .grid(row=0, column=0, columnspan=2, sticky="ew", padx=2, pady=15)
         
-        ttk.Label(self.district_stats, text=f"Highest: {highest_district[0]} ({highest_district[1]})", font=("Arial", 12), style="Card.TLabel", anchor="center") \
+        self.highest_district_var = ttk.StringVar(value="Highest: -")
+        ttk.Label(self.district_stats, textvariable=self.highest_district_var, font=("Arial", 12), style="Card.TLabel", anchor="center") \
             .grid(row=1, column=0, sticky="ew", padx=2, pady=(10, 20))
         
-        ttk.Label(self.district_stats, text=f"Lowest: {lowest_district[0]} ({lowest_district[1]})", font=("Arial", 12), style="Card.TLabel", anchor="center") \
+        self.lowest_district_var = ttk.StringVar(value="Lowest: -")
+        ttk.Label(self.district_stats, textvariable=self.lowest_district_var, font=("Arial", 12), style="Card.TLabel", anchor="center") \
             .grid(row=1, column=1, sticky="ew", padx=2, pady=(10, 20))
         
         # Expand button
-        self.expand_image_normal = ImageTk.PhotoImage(Image.open("assets/images/expand.png").resize((15, 15)))
-        self.expand_image_hover = ImageTk.PhotoImage(Image.open("assets/images/expand_hover.png").resize((15, 15)))
+        self.expand_image_normal = assets.photo_image("assets/images/expand.png", (15, 15))
+        self.expand_image_hover = assets.photo_image("assets/images/expand_hover.png", (15, 15))
 
         self.expand_stats = ttk.Label(self.district_stats, image=self.expand_image_normal, style="Card.TLabel", cursor="hand2")
         self.expand_stats.grid(row=0, column=1, sticky="ne", padx=(0, 15), pady=(15, 0))
@@ -182,41 +190,12 @@ class HomePage(ttk.Frame):
         ttk.Label(self.monthly_stats, text=f"Monthly Stats", font=("Arial Black", 12), style="Card.TLabel", anchor="center") \
             .grid(row=0, column=0, columnspan=2, sticky="ew", padx=2, pady=(10, 0))
         
-        ttk.Label(self.monthly_stats, text=f"January: {month_stats.get(1, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=1, column=0, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"February: {month_stats.get(2, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=2, column=0, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"March: {month_stats.get(3, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=3, column=0, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"April: {month_stats.get(4, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=4, column=0, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"May: {month_stats.get(5, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=5, column=0, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"June: {month_stats.get(6, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=6, column=0, sticky="ew", padx=30, pady=(0, 20))
-        
-        ttk.Label(self.monthly_stats, text=f"July: {month_stats.get(7, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=1, column=1, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"August: {month_stats.get(8, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=2, column=1, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"September: {month_stats.get(9, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=3, column=1, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"October: {month_stats.get(10, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=4, column=1, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"November: {month_stats.get(11, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=5, column=1, sticky="ew", padx=30)
-        
-        ttk.Label(self.monthly_stats, text=f"December: {month_stats.get(12, 0)}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-            .grid(row=6, column=1, sticky="ew", padx=30, pady=(0, 20))
+        self.month_vars = {}
+        for month in range(1, 13):
+            self.month_vars[month] = ttk.StringVar(value=f"{month_name[month]}: -")
+            padding = (0, 20) if month in (6, 12) else 0
+            ttk.Label(self.monthly_stats, textvariable=self.month_vars[month], font=("Arial", 12), style="Card.TLabel", anchor="center") \
+                .grid(row=(month - 1) % 6 + 1, column=(month - 1) // 6, sticky="ew", padx=30, pady=padding)
         
         self.monthly_stats.grid_columnconfigure(0, weight=1)
         self.monthly_stats.grid_columnconfigure(1, weight=1)
@@ -229,37 +208,59 @@ class HomePage(ttk.Frame):
         self.monthly_stats.grid_rowconfigure(6, weight=1)
 
 
-    def load_concert(self, concert):
+    @timed()
+    def load_stats(self):
+        self.stats_store.refresh()
+
+
+    def show_stats(self, stats: tuple[dict, dict, dict]):
+        year_stats, district_stats, month_stats = stats
+
+        set_if_changed(self.last_year_var, f"Last Year: {year_stats['previous']}")
+        set_if_changed(self.this_year_var, f"This Year: {year_stats['current']}")
+
+        highest_district = max(district_stats.items(), key=lambda x: x[1])
+        played = {district: count for district, count in district_stats.items() if count > 0}
+        set_if_changed(self.highest_district_var, f"Highest: {highest_district[0]} ({highest_district[1]})")
+        if played:
+            lowest_district = min(played.items(), key=lambda x: x[1])
+            set_if_changed(self.lowest_district_var, f"Lowest: {lowest_district[0]} ({lowest_district[1]})")
+        else:
+            set_if_changed(self.lowest_district_var, "Lowest: -")
+
+        for month, var in self.month_vars.items():
+            set_if_changed(var, f"{month_name[month]}: {month_stats.get(month, 0)}")
+
+
+    @timed()
+    def load_concert(self, concert: Concert):
         self.clear_form()
-        self.concert_id = concert["id"]
-        self.is_cancelled = concert["is_cancelled"]
-
-        self.org_entry.insert(0, concert["organizer"] or "")
-        self.venue_entry.insert(0, concert["venue"] or "")
-        self.city_entry.insert(0, concert["city"] or "")
-        self.district_cb.set(concert["district"] or "-- Select District --")
-
-        self.total_entry.insert(0, format_indian_number(concert["total"]))
-        self.advance_entry.insert(0, format_indian_number(concert["advance"]))
-        self.contact_entry.insert(0, concert["contact"] or "")
-        self.note_entry.insert(0, concert["note"] or "")
-
-        self.sound_var.set(concert["is_sound_included"])
-
-        # Parse date
-        year, month, day = concert["date"].split("-")
-        month_index = int(month) - 1
-        month_name = self.month_cb["values"][month_index]
-        self.day_cb.set(day)
+        self.concert_id = concert.id
+        self.is_cancelled = concert.is_cancelled
+
+        self.org_entry.insert(0, concert.organizer or "")
+        self.venue_entry.insert(0, concert.venue or "")
+        self.city_entry.insert(0, concert.city or "")
+        self.district_cb.set(concert.district or "-- Select District --")
+
+        self.total_entry.insert(0, format_indian_number(concert.total))
+        self.advance_entry.insert(0, format_indian_number(concert.advance))
+        self.contact_entry.insert(0, concert.contact or "")
+        self.note_entry.insert(0, concert.note or "")
+
+        self.sound_var.set(concert.is_sound_included)
+
+        # Date
+        month_name = self.month_cb["values"][concert.date.month - 1]
+        self.day_cb.set(f"{concert.date.day:02}")
         self.month_cb.set(month_name)
-        self.year_cb.set(year)
+        self.year_cb.set(str(concert.date.year))
 
-        hour, minute, _ = concert["time"].split(":")
-        hour = int(hour)
+        hour = concert.time.hour
         ampm = "AM" if hour < 12 else "PM"
         hour_12 = hour % 12 or 12
         self.hour_cb.set(f"{hour_12:02}")
-        self.min_cb.set(minute)
+        self.min_cb.set(f"{concert.time.minute:02}")
         self.ampm_cb.set(ampm)
 
         self.load_stats()
@@ -356,26 +357,41 @@ class HomePage(ttk.Frame):
             messagebox.showwarning("Invalid Amounts", f"Total cannot be less than Advance.")
             return
         
-        concert = {
-            "id": self.concert_id,
-            "organizer": self.org_entry.get().strip(),
-            "venue": self.venue_entry.get().strip(),
-            "city": self.city_entry.get().strip(),
-            "district": self.district_cb.get(),
-            "date": f"{self.year_cb.get()}-{self.month_cb.current() + 1:02}-{self.day_cb.get()}",
-            "time": f"{int(self.hour_cb.get()) % 12 + (12 if self.ampm_cb.get() == 'PM' else 0):02}:{self.min_cb.get()}:00",
-            "is_sound_included": self.sound_var.get(),
-            "total": int(self.total_entry.get().replace(",", "")),
-            "advance": int(self.advance_entry.get().replace(",", "")),
-            "contact": self.contact_entry.get().strip() if self.contact_entry.get() else None,
-            "note": self.note_entry.get().strip() if self.note_entry.get() else None,
-            "is_cancelled": self.is_cancelled
-        }
-
-        generate_contract_pdf(concert)
-        self.supabase.save_concert(concert)
-        messagebox.showinfo("Success", "Concert saved successfully!")
-        self.show_page("concerts")
+        try:
+            concert_date = date(int(self.year_cb.get()), self.month_cb.current() + 1, int(self.day_cb.get()))
+        except ValueError:
+            messagebox.showwarning("Invalid Date", f"{self.month_cb.get()} {self.year_cb.get()} has no day {self.day_cb.get()}.")
+            return
+        
+        concert = Concert(
+            id=self.concert_id,
+            organizer=self.org_entry.get().strip(),
+            venue=self.venue_entry.get().strip(),
+            city=self.city_entry.get().strip(),
+            district=self.district_cb.get(),
+            date=concert_date,
+            time=time(int(self.hour_cb.get()) % 12 + (12 if self.ampm_cb.get() == 'PM' else 0), int(self.min_cb.get())),
+            is_sound_included=self.sound_var.get(),
+            total=int(self.total_entry.get().replace(",", "")),
+            advance=int(self.advance_entry.get().replace(",", "")),
+            contact=self.contact_entry.get().strip() if self.contact_entry.get() else None,
+            note=self.note_entry.get().strip() if self.note_entry.get() else None,
+            is_cancelled=self.is_cancelled
+        )
+
+        def on_saved(_):
+            self.save_btn.config(state="normal", text="Save Concert")
+            # The contract is rendered in the background, the status bar reports when it's done
+            self.contracts.enqueue(concert)
+            messagebox.showinfo("Success", "Concert saved successfully!")
+            self.show_page("concerts")
+
+        def on_error(error):
+            self.save_btn.config(state="normal", text="Save Concert")
+            self.runner.show_error(error)
+
+        self.save_btn.config(state="disabled", text="Saving...")
+        self.runner.submit(self.supabase.save_concert, concert, on_success=on_saved, on_error=on_error)
     
 
     
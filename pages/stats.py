@@ -2,14 +2,18 @@ import tkinter as tk
 import ttkbootstrap as ttk
 from calendar import month_name
 
-from libs.supabase_client import Supabase
-from libs.utils import lighten_color
+from libs.stats import StatsStore
+from libs.worker import BackgroundRunner
+from libs.utils import lighten_color, set_if_changed
+from libs.data import Districts
+from libs.timing import timed
 
 class StatsPage(ttk.Frame):
-    def __init__(self, parent: ttk.Frame, supabase: Supabase, show_page_callback):
+    def __init__(self, parent: ttk.Frame, stats_store: StatsStore, runner: BackgroundRunner, show_page_callback):
         super().__init__(parent)
         self.show_page_callback = show_page_callback
-        self.supabase = supabase
+        self.stats_store = stats_store
+        self.runner = runner
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -40,59 +44,40 @@ class StatsPage(ttk.Frame):
 
         view_btn = ttk.Button(button_frame, text="View Concerts", width=16, command=lambda: self.show_page("concerts"))
         view_btn.pack(side="right", padx=15, pady=(50, 0), ipady=5)
-    
 
-    def load_stats(self):
-        for stats in [self.district_stats, self.yearly_stats, self.monthly_stats]:
-            for widget in stats.winfo_children():
-                widget.destroy()
-        
-        year_stats, district_stats, month_stats = self.supabase.get_stats()
+        self.refresh_btn = ttk.Button(button_frame, text="Refresh", command=lambda: self.load_stats(refresh=True))
+        self.refresh_btn.pack(side="right", padx=5, pady=(50, 0), ipady=5)
+
+        self.build_stats()
+        self.stats_store.subscribe(self.show_stats, on_error=self.on_stats_error)
+    
 
+    def build_stats(self):
+        """Create the stats cards once, refreshes only update their text variables."""
         # Create district stats
         ttk.Label(self.district_stats, text=f"District Stats", font=("Arial Black", 12), style="Card.TLabel", anchor="center") \
             .grid(row=0, column=0, columnspan=2, sticky="ew", padx=2, pady=(10, 0))
         
-        for index, (district, count) in enumerate(list(district_stats.items())[:12]):
-            if count == 0:
-                ttk.Label(self.district_stats, text=f"{district}: {count}", font=("Arial", 12), style="Card.TLabel", anchor="center", foreground="#ff4d4d") \
-                    .grid(row=index + 1, column=0, sticky="ew", padx=30, pady=(0, 20))
-            else:
-                ttk.Label(self.district_stats, text=f"{district}: {count}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-                    .grid(row=index + 1, column=0, sticky="ew", padx=30, pady=(0, 20))
-        
-        for index, (district, count) in enumerate(list(district_stats.items())[12:], start=12):
-            if count == 0:
-                ttk.Label(self.district_stats, text=f"{district}: {count}", font=("Arial", 12), style="Card.TLabel", anchor="center", foreground="#ff4d4d") \
-                    .grid(row=index - 11, column=1, sticky="ew", padx=30, pady=(0, 20))
-            else:
-                ttk.Label(self.district_stats, text=f"{district}: {count}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
-                    .grid(row=index - 11, column=1, sticky="ew", padx=30, pady=(0, 20))
+        # One slot per rank, as the districts are shown sorted by count
+        self.district_slots = []
+        for index in range(len(Districts)):
+            self.add_district_slot(index)
         
         self.district_stats.grid_columnconfigure(0, weight=1)
         self.district_stats.grid_columnconfigure(1, weight=1)
-        self.district_stats.grid_rowconfigure(0, weight=1)
-        self.district_stats.grid_rowconfigure(1, weight=1)
-        self.district_stats.grid_rowconfigure(2, weight=1)
-        self.district_stats.grid_rowconfigure(3, weight=1)
-        self.district_stats.grid_rowconfigure(4, weight=1)
-        self.district_stats.grid_rowconfigure(5, weight=1)
-        self.district_stats.grid_rowconfigure(6, weight=1)
-        self.district_stats.grid_rowconfigure(7, weight=1)
-        self.district_stats.grid_rowconfigure(8, weight=1)
-        self.district_stats.grid_rowconfigure(9, weight=1)
-        self.district_stats.grid_rowconfigure(10, weight=1)
-        self.district_stats.grid_rowconfigure(11, weight=1)
-        self.district_stats.grid_rowconfigure(12, weight=1)
+        for row in range(13):
+            self.district_stats.grid_rowconfigure(row, weight=1)
 
         # Create yearly stats
         ttk.Label(self.yearly_stats, text=f"Yearly Stats", font=("Arial Black", 12), style="Card.TLabel", anchor="center") \
             .grid(row=0, column=0, columnspan=2, sticky="ew", padx=2, pady=10)
         
-        ttk.Label(self.yearly_stats, text=f"Last Year: {year_stats['previous']}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
+        self.last_year_var = ttk.StringVar(value="Last Year: -")
+        ttk.Label(self.yearly_stats, textvariable=self.last_year_var, font=("Arial", 12), style="Card.TLabel", anchor="center") \
             .grid(row=1, column=0, sticky="ew", padx=2, pady=(0, 20))
         
-        ttk.Label(self.yearly_stats, text=f"This Year: {year_stats['current']}", font=("Arial", 12), style="Card.TLabel", anchor="center") \
+        self.this_year_var = ttk.StringVar(value="This Year: -")
+        ttk.Label(self.yearly_stats, textvariable=self.this_year_var, font=("Arial", 12), style="Card.TLabel", anchor="center") \
             .grid(row=1, column=1, sticky="ew", padx=2, pady=(0, 20))
         
         self.yearly_stats.grid_columnconfigure(0, weight=1)
@@ -103,38 +88,75 @@ class StatsPage(ttk.Frame):
         # Create monthly stats
         ttk.Label(self.monthly_stats, text=f"Monthly Stats", font=("Arial Black", 12), style="Card.TLabel", anchor="center") \
             .grid(row=0, column=0, columnspan=2, sticky="ew", padx=2, pady=(10, 0))
-            
-        for month in range(1, 7):
-            padding = (0, 20) if month == 6 else (0, 10)
-            if month_stats.get(month, 0) == 0:
-                ttk.Label(self.monthly_stats, text=f"{month_name[month]}: {month_stats.get(month, 0)}",
-                          font=("Arial", 12), style="Card.TLabel", anchor="center", foreground="#ff4d4d") \
-                          .grid(row=month, column=0, sticky="ew", padx=30, pady=padding)
-            else:
-                ttk.Label(self.monthly_stats, text=f"{month_name[month]}: {month_stats.get(month, 0)}",
-                          font=("Arial", 12), style="Card.TLabel", anchor="center") \
-                          .grid(row=month, column=0, sticky="ew", padx=30, pady=padding)
         
-        for month in range(7, 13):
-            padding = (0, 20) if month == 12 else (0, 0)
-            if month_stats.get(month, 0) == 0:
-                ttk.Label(self.monthly_stats, text=f"{month_name[month]}: {month_stats.get(month, 0)}",
-                          font=("Arial", 12), style="Card.TLabel", anchor="center", foreground="#ff4d4d") \
-                          .grid(row=month - 6, column=1, sticky="ew", padx=30, pady=padding)
+        self.month_slots = {}
+        for month in range(1, 13):
+            if month <= 6:
+                padding = (0, 20) if month == 6 else (0, 10)
             else:
-                ttk.Label(self.monthly_stats, text=f"{month_name[month]}: {month_stats.get(month, 0)}",
-                          font=("Arial", 12), style="Card.TLabel", anchor="center") \
-                          .grid(row=month - 6, column=1, sticky="ew", padx=30, pady=padding)
+                padding = (0, 20) if month == 12 else (0, 0)
+            var = ttk.StringVar(value=f"{month_name[month]}: -")
+            label = ttk.Label(self.monthly_stats, textvariable=var, font=("Arial", 12), style="Card.TLabel", anchor="center")
+            label.grid(row=(month - 1) % 6 + 1, column=(month - 1) // 6, sticky="ew", padx=30, pady=padding)
+            self.month_slots[month] = [var, label, None]
         
         self.monthly_stats.grid_columnconfigure(0, weight=1)
         self.monthly_stats.grid_columnconfigure(1, weight=1)
-        self.monthly_stats.grid_rowconfigure(0, weight=1)
-        self.monthly_stats.grid_rowconfigure(1, weight=1)
-        self.monthly_stats.grid_rowconfigure(2, weight=1)
-        self.monthly_stats.grid_rowconfigure(3, weight=1)
-        self.monthly_stats.grid_rowconfigure(4, weight=1)
-        self.monthly_stats.grid_rowconfigure(5, weight=1)
-        self.monthly_stats.grid_rowconfigure(6, weight=1)
+        for row in range(7):
+            self.monthly_stats.grid_rowconfigure(row, weight=1)
+
+
+    def add_district_slot(self, index: int):
+        var = ttk.StringVar(value="")
+        label = ttk.Label(self.district_stats, textvariable=var, font=("Arial", 12), style="Card.TLabel", anchor="center")
+        if index < 12:
+            label.grid(row=index + 1, column=0, sticky="ew", padx=30, pady=(0, 20))
+        else:
+            label.grid(row=index - 11, column=1, sticky="ew", padx=30, pady=(0, 20))
+        # [text variable, label, whether it's currently highlighted as zero]
+        self.district_slots.append([var, label, None])
+    
+
+    @timed()
+    def load_stats(self, refresh: bool = False):
+        self.refresh_btn.config(state="disabled", text="Loading...")
+        self.stats_store.refresh(force=refresh)
+
+
+    def on_stats_error(self, error):
+        self.refresh_btn.config(state="normal", text="Refresh")
+        self.runner.show_error(error)
+
+
+    def show_stats(self, stats: tuple[dict, dict, dict]):
+        self.refresh_btn.config(state="normal", text="Refresh")
+        year_stats, district_stats, month_stats = stats
+
+        # Districts outside the known list only show up if the database has them
+        while len(self.district_slots) < len(district_stats):
+            self.add_district_slot(len(self.district_slots))
+        
+        for slot, (district, count) in zip(self.district_slots, district_stats.items()):
+            self.update_slot(slot, f"{district}: {count}", count == 0)
+        
+        # Slots of districts that dropped out since the last recount
+        for slot in self.district_slots[len(district_stats):]:
+            self.update_slot(slot, "", False)
+
+        set_if_changed(self.last_year_var, f"Last Year: {year_stats['previous']}")
+        set_if_changed(self.this_year_var, f"This Year: {year_stats['current']}")
+
+        for month, slot in self.month_slots.items():
+            count = month_stats.get(month, 0)
+            self.update_slot(slot, f"{month_name[month]}: {count}", count == 0)
+
+
+    def update_slot(self, slot: list, text: str, is_zero: bool):
+        var, label, was_zero = slot
+        set_if_changed(var, text)
+        if is_zero != was_zero:
+            label.config(foreground="#ff4d4d" if is_zero else "")
+            slot[2] = is_zero
 
 
     def show_page(self, page_name):
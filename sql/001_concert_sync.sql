@@ -0,0 +1,65 @@
+-- Delta sync support for the local concert cache (libs/cache.py).
+-- Every change to a concert bumps updated_at, and every delete leaves a
+-- tombstone, so clients only need to ask for what changed since their
+-- last sync watermark. A transaction can commit after a later stamped row
+-- was already synced, so clients ask again from a minute before their
+-- watermark (SYNC_OVERLAP in libs/supabase_client.py). The stamps use
+-- clock_timestamp(), the time of the write rather than of the transaction
+-- start, so only the time between a write and its commit has to fit in it.
+
+alter table concert add column if not exists updated_at timestamptz not null default now();
+create index if not exists concert_updated_at_idx on concert (updated_at);
+
+create or replace function concert_touch() returns trigger as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists concert_touch on concert;
+create trigger concert_touch
+    before insert or update on concert
+    for each row execute function concert_touch();
+
+
+create table if not exists concert_tombstone (
+    id uuid primary key,
+    deleted_at timestamptz not null default clock_timestamp()
+);
+alter table concert_tombstone alter column deleted_at set default clock_timestamp();
+create index if not exists concert_tombstone_deleted_at_idx on concert_tombstone (deleted_at);
+
+-- The tombstone functions run as their owner (security definer), the app's
+-- key may only read tombstones, and deleting a concert has to write one
+create or replace function concert_record_tombstone() returns trigger as $$
+begin
+    insert into concert_tombstone (id) values (old.id)
+        on conflict (id) do update set deleted_at = clock_timestamp();
+    return old;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+drop trigger if exists concert_record_tombstone on concert;
+create trigger concert_record_tombstone
+    after delete on concert
+    for each row execute function concert_record_tombstone();
+
+-- A concert recreated with the id of a deleted one (e.g. "keep mine" on a
+-- remotely deleted concert) must not stay deleted for clients that sync both
+create or replace function concert_clear_tombstone() returns trigger as $$
+begin
+    delete from concert_tombstone where id = new.id;
+    return new;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+drop trigger if exists concert_clear_tombstone on concert;
+create trigger concert_clear_tombstone
+    after insert on concert
+    for each row execute function concert_clear_tombstone();
+
+-- The app reads tombstones with the same key it uses for the concert table
+alter table concert_tombstone enable row level security;
+drop policy if exists "Tombstones are readable" on concert_tombstone;
+create policy "Tombstones are readable" on concert_tombstone for select using (true);
@@ -0,0 +1,39 @@
+-- Aggregated stats for the home and stats pages in a single round trip.
+-- Returns {"previous": n, "current": n, "districts": {name: n}, "months": {month: n}}
+-- counting only concerts that are not cancelled. The year is passed in by the
+-- client so "this year" follows the user's calendar, not the server's.
+
+create or replace function concert_stats(target_year int)
+returns json
+language sql
+stable
+as $$
+    with current_year as (
+        select coalesce(district, 'Other') as district,
+               extract(month from date)::int as month
+        from concert
+        where not is_cancelled
+          and date >= make_date(target_year, 1, 1)
+          and date < make_date(target_year + 1, 1, 1)
+    )
+    select json_build_object(
+        'previous', (
+            select count(*)
+            from concert
+            where not is_cancelled
+              and date >= make_date(target_year - 1, 1, 1)
+              and date < make_date(target_year, 1, 1)
+        ),
+        'current', (select count(*) from current_year),
+        'districts', coalesce((
+            select json_object_agg(district, total)
+            from (select district, count(*) as total from current_year group by district) d
+        ), '{}'::json),
+        'months', coalesce((
+            select json_object_agg(month, total)
+            from (select month, count(*) as total from current_year group by month) m
+        ), '{}'::json)
+    );
+$$;
+
+create index if not exists concert_date_idx on concert (date);
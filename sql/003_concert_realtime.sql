@@ -0,0 +1,13 @@
+-- Push concert changes to connected clients (libs/feed.py).
+-- Deletes only carry the primary key, which is all the client needs.
+
+do $$
+begin
+    if not exists (
+        select 1 from pg_publication_tables
+        where pubname = 'supabase_realtime' and schemaname = 'public' and tablename = 'concert'
+    ) then
+        alter publication supabase_realtime add table concert;
+    end if;
+end;
+$$;
@@ -0,0 +1,63 @@
+"""
+The amount formatting functions as they were before libs/formatting.py
+cached and batched them, kept as the reference the new ones must agree with
+(tests/test_formatting.py) and are timed against (benchmarks/bench_formatting.py).
+"""
+import re
+import random
+
+
+def reference_format_indian_number(number: int | str) -> str:
+    if not number:
+        return ""
+    if isinstance(number, int):
+        number = str(number)
+    number = re.sub(r"[^\d]", "", number)
+    if not number:
+        return ""
+    if len(number) <= 3:
+        return number
+    last_three = number[-3:]
+    rest = number[:-3]
+    parts = []
+    while len(rest) > 2:
+        parts.append(rest[-2:])
+        rest = rest[:-2]
+    if rest:
+        parts.append(rest)
+    parts.reverse()
+    return ",".join(parts) + "," + last_three
+
+
+def reference_number_to_words(num: int) -> str:
+    units = [
+        "Zero", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine",
+        "Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"
+    ]
+    tens = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+    def convert_integer(n: int) -> str:
+        if n < 20:
+            return units[n]
+        if n < 100:
+            return tens[n // 10] + (" " + units[n % 10] if n % 10 != 0 else "")
+        if n < 1000:
+            return units[n // 100] + " Hundred" + (" And " + convert_integer(n % 100) if n % 100 != 0 else "")
+        if n < 100000:
+            return convert_integer(n // 1000) + " Thousand" + (" " + convert_integer(n % 1000) if n % 1000 != 0 else "")
+        if n < 10000000:
+            return convert_integer(n // 100000) + " Lakh" + (" " + convert_integer(n % 100000) if n % 100000 != 0 else "")
+        if n < 1000000000:
+            return convert_integer(n // 10000000) + " Crore" + (" " + convert_integer(n % 10000000) if n % 10000000 != 0 else "")
+        return convert_integer(n // 1000000000) + " Arab" + (" " + convert_integer(n % 1000000000) if n % 1000000000 != 0 else "")
+
+    try:
+        return "Rupees " + convert_integer(num) + " Only"
+    except ValueError:
+        return ""
+
+
+def amounts(count: int, seed: int = 0) -> list[int]:
+    # Concert fees: mostly round figures in thousands, so the same amounts come back a lot
+    rng = random.Random(seed)
+    return [rng.randint(1, 300) * 1000 if rng.random() < 0.9 else rng.randint(0, 10 ** 7) for _ in range(count)]
@@ -0,0 +1,47 @@
+import pytest
+
+from tests.reference_formatting import amounts, reference_format_indian_number, reference_number_to_words
+from libs.formatting import format_indian_number, format_indian_numbers, number_to_words
+
+
+INTEGERS = (
+    0, 1, 9, 10, 99, 100, 999, 1000, 1001, 9999, 10000, 99999, 100000, 100001, 999999, 1000000,
+    9999999, 10000000, 123456789, 999999999, 1000000000, 1000000001, 123456789012,
+)
+
+# As typed into the amount entries, including leading zeros and non-ASCII digits
+STRINGS = ("", "0", "00", "007", "0012345", "1,23,456", "12a34b5", "abc", " 4 500 ", "١٢٣٤", "12,3", ",")
+
+AMOUNTS = amounts(20000)
+
+
+@pytest.mark.parametrize("number", INTEGERS + (-1234, -5) + STRINGS)
+def test_format_indian_number_edge_cases(number):
+    assert format_indian_number(number) == reference_format_indian_number(number)
+
+
+@pytest.mark.parametrize("number", INTEGERS)
+def test_format_indian_number_typed(number):
+    # With or without the commas already there
+    for text in (str(number), reference_format_indian_number(number)):
+        assert format_indian_number(text) == reference_format_indian_number(text)
+
+
+def test_format_indian_number_amounts():
+    for number in AMOUNTS:
+        assert format_indian_number(number) == reference_format_indian_number(number)
+        assert format_indian_number(str(number)) == reference_format_indian_number(str(number))
+
+
+def test_format_indian_numbers():
+    assert format_indian_numbers(AMOUNTS) == [reference_format_indian_number(number) for number in AMOUNTS]
+
+
+@pytest.mark.parametrize("number", INTEGERS)
+def test_number_to_words_edge_cases(number):
+    assert number_to_words(number) == reference_number_to_words(number)
+
+
+def test_number_to_words_amounts():
+    for number in AMOUNTS:
+        assert number_to_words(number) == reference_number_to_words(number)
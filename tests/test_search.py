@@ -0,0 +1,94 @@
+from libs.models import Concert
+from libs.search import SearchIndex
+
+
+def make_index(**organizers) -> SearchIndex:
+    index = SearchIndex()
+    index.add_many({concert_id: Concert(concert_id, organizer) for concert_id, organizer in organizers.items()})
+    return index
+
+
+def assert_empty(index: SearchIndex):
+    assert len(index) == 0
+    assert index.ids_by_token == {}
+    assert index.ids_by_prefix == {}
+    assert index.sorted_tokens == []
+
+
+def test_add_and_search():
+    index = make_index(a="Uttarpara Sporting Club", b="Sporting Union")
+    assert index.search("utt spo") == {"a"}
+    assert index.search("s") == {"a", "b"}
+    assert index.search("sporting") == {"a", "b"}
+    assert index.search("club union") == set()
+    assert index.search("  ") is None
+
+
+def test_add_one_by_one_keeps_tokens_sorted():
+    index = SearchIndex()
+    index.add("a", Concert("a", "Zeta Alpha"))
+    index.add("b", Concert("b", "Mid"))
+    assert index.sorted_tokens == ["alpha", "mid", "zeta"]
+    assert index.search("mi") == {"b"}
+    assert index.search("zet") == {"a"}
+
+
+def test_remove():
+    index = make_index(a="Uttarpara Sporting Club", b="Sporting Union")
+    index.remove("a")
+    assert index.search("utt") == set()
+    assert index.search("u") == {"b"}
+    assert index.search("spo") == {"b"}
+    index.remove("b")
+    assert_empty(index)
+
+
+def test_remove_unknown():
+    index = make_index(a="Club")
+    index.remove("b")
+    assert index.search("club") == {"a"}
+
+
+def test_remove_tokens_with_shared_prefix():
+    index = make_index(a="abc abd")
+    index.remove("a")
+    assert_empty(index)
+
+
+def test_readd_tokens_with_shared_prefix():
+    index = make_index(a="abc abd", b="Other")
+    index.add("a", Concert("a", "xyz"))
+    assert index.search("ab") == set()
+    assert index.search("a") == set()
+    assert index.search("x") == {"a"}
+    assert "a" not in index.ids_by_prefix
+    assert index.sorted_tokens == ["other", "xyz"]
+
+
+def test_readd_keeps_prefix_of_remaining_token():
+    index = make_index(a="abc abd")
+    index.add("a", Concert("a", "abc"))
+    assert index.search("ab") == {"a"}
+    assert index.search("abd") == set()
+    assert index.search("abc") == {"a"}
+
+
+def test_readd_unchanged():
+    index = make_index(a="Sporting Club")
+    index.add("a", Concert("a", "Club Sporting"))
+    assert index.search("sp cl") == {"a"}
+
+
+def test_clear():
+    index = make_index(a="Sporting Club")
+    index.clear()
+    assert_empty(index)
+    index.add("b", Concert("b", "Union"))
+    assert index.search("un") == {"b"}
+
+
+def test_clear_while_adding_many():
+    index = SearchIndex()
+    index.sorted_tokens = None
+    index.clear()
+    assert_empty(index)